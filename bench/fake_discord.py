@@ -0,0 +1,328 @@
+import asyncio
+import itertools
+import random
+import types
+from datetime import datetime, timezone
+
+import discord
+from discord.http import Route
+
+# Objetos mínimos que imitam servidor, canais, membros e interações do discord.py, só
+# com o que a cog de tickets usa. Toda chamada que no bot real seria REST passa pelo
+# FakeHTTP, que aplica a latência configurada e injeta 429.
+
+CATEGORY_LIMIT = 50
+_ids = itertools.count(1_100_000_000_000_000_000)
+
+
+def snowflake(): return next(_ids)
+
+
+class FakeHTTP:
+    def __init__(self, latency=0.05, jitter=0.02, rate_limit_chance=0.0, retry_after=1.0, seed=None):
+        self.latency, self.jitter = latency, jitter
+        self.rate_limit_chance, self.retry_after = rate_limit_chance, retry_after
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.rate_limited = 0
+
+    async def wait(self):
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+    # Mesmo contrato do HTTPClient.request (instrumentável pelo METRICS). Um 429 é
+    # absorvido como no discord.py: espera o retry_after e repete a chamada.
+    async def request(self, route, **kwargs):
+        while True:
+            self.calls += 1
+            await self.wait()
+            if self.random.random() >= self.rate_limit_chance: return
+            self.rate_limited += 1
+            await asyncio.sleep(self.retry_after)
+
+
+def _category_full_error():
+    response = types.SimpleNamespace(status=400, reason="Bad Request")
+    return discord.HTTPException(response, {
+        "code": 50035, "message": "Invalid Form Body",
+        "errors": {"parent_id": {"_errors": [{"code": "CHANNEL_PARENT_MAX_CHANNELS", "message": "Maximum number of channels in category reached (50)"}]}},
+    })
+
+
+class FakeRole:
+    def __init__(self, name):
+        self.id, self.name = snowflake(), name
+
+    @property
+    def mention(self): return f"<@&{self.id}>"
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content=None, embeds=(), view=None, files=()):
+        self.id = snowflake()
+        self.channel, self.author, self.guild = channel, author, getattr(channel, "guild", None)
+        self.content = content or ""
+        self.embeds = list(embeds)
+        self.view = view
+        self.files = list(files)
+        self.attachments = []
+        self.created_at = datetime.now(timezone.utc)
+
+    async def edit(self, **kwargs):
+        await self.channel.http.request(Route("PATCH", "/channels/{channel_id}/messages/{message_id}", channel_id=self.channel.id, message_id=self.id))
+        if "view" in kwargs: self.view = kwargs["view"]
+        if "embed" in kwargs: self.embeds = [kwargs["embed"]]
+        return self
+
+    async def create_thread(self, name, auto_archive_duration=1440):
+        await self.channel.http.request(Route("POST", "/channels/{channel_id}/messages/{message_id}/threads", channel_id=self.channel.id, message_id=self.id))
+
+
+def _collect(embed=None, embeds=None, file=None, files=None):
+    embeds = list(embeds or ([embed] if embed else []))
+    files = list(files or ([file] if file else []))
+    # O upload real lê o arquivo inteiro; aqui a leitura entra na conta do mesmo jeito.
+    for f in files: f.fp.read()
+    return embeds, files
+
+
+class FakeMember:
+    def __init__(self, guild, name, roles=(), bot=False):
+        self.id, self.name, self.display_name = snowflake(), name, name
+        self.guild, self.roles, self.bot = guild, list(roles), bot
+        self.avatar = None
+        self.display_avatar = types.SimpleNamespace(url=f"https://cdn.discordapp.com/embed/avatars/{self.id % 5}.png")
+        self.dm_channel = None
+        self.dms = asyncio.Queue()
+
+    @property
+    def mention(self): return f"<@{self.id}>"
+
+    def get_role(self, role_id): return next((r for r in self.roles if r.id == role_id), None)
+
+    async def send(self, content=None, *, embed=None, embeds=None, file=None, files=None, view=None):
+        http = self.guild.http
+        if self.dm_channel is None:
+            await http.request(Route("POST", "/users/@me/channels"))
+            self.dm_channel = types.SimpleNamespace(id=snowflake(), http=http, guild=None)
+        await http.request(Route("POST", "/channels/{channel_id}/messages", channel_id=self.dm_channel.id))
+        embeds, files = _collect(embed, embeds, file, files)
+        message = FakeMessage(self.dm_channel, self.guild.bot.user, content, embeds, view, files)
+        self.dms.put_nowait(message)
+        return message
+
+
+class FakeCategory(discord.CategoryChannel):
+    # Subclasse real para passar nos isinstance da cog; só os campos usados são preenchidos.
+    def __init__(self, guild, name, position):
+        self.id, self.name, self.guild, self.position = snowflake(), name, guild, position
+        self.category_id, self.nsfw, self._overwrites = None, False, []
+        self.contents = []
+
+    @property
+    def channels(self): return list(self.contents)
+
+    @property
+    def text_channels(self): return list(self.contents)
+
+    @property
+    def overwrites(self): return {}
+
+    async def delete(self, reason=None):
+        await self.guild.http.request(Route("DELETE", "/channels/{channel_id}", channel_id=self.id))
+        self.guild.channels.pop(self.id, None)
+
+
+class FakeTextChannel(discord.TextChannel):
+    def __init__(self, guild, name, category, topic=None):
+        self.id, self.name, self.guild, self.topic = snowflake(), name, guild, topic
+        self.category_id = category.id if category else None
+        self.nsfw, self.position, self._overwrites = False, 0, []
+        self.messages = []
+        self.last_message_id = None
+
+    @property
+    def http(self): return self.guild.http
+
+    @property
+    def category(self): return self.guild.channels.get(self.category_id)
+
+    async def send(self, content=None, *, embed=None, embeds=None, file=None, files=None, view=None):
+        await self.http.request(Route("POST", "/channels/{channel_id}/messages", channel_id=self.id))
+        embeds, files = _collect(embed, embeds, file, files)
+        message = FakeMessage(self, self.guild.bot.user, content, embeds, view, files)
+        self.messages.append(message)
+        self.last_message_id = message.id
+        return message
+
+    async def fetch_message(self, message_id):
+        await self.http.request(Route("GET", "/channels/{channel_id}/messages/{message_id}", channel_id=self.id, message_id=message_id))
+        message = next((m for m in self.messages if m.id == message_id), None)
+        if message is None: raise discord.NotFound(types.SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+        return message
+
+    async def edit(self, *, category=None, **kwargs):
+        await self.http.request(Route("PATCH", "/channels/{channel_id}", channel_id=self.id))
+        before = FakeTextChannel.__new__(FakeTextChannel)
+        before.id, before.guild, before.name, before.topic, before.category_id = self.id, self.guild, self.name, self.topic, self.category_id
+        if category is not None and category.id != self.category_id:
+            if len(category.contents) >= CATEGORY_LIMIT: raise _category_full_error()
+            if self.category: self.category.contents.remove(self)
+            category.contents.append(self)
+            self.category_id = category.id
+        self.guild.bot.dispatch("guild_channel_update", before, self)
+        return self
+
+    async def delete(self, reason=None):
+        await self.http.request(Route("DELETE", "/channels/{channel_id}", channel_id=self.id))
+        if self.category: self.category.contents.remove(self)
+        self.guild.channels.pop(self.id, None)
+        self.guild.bot.dispatch("guild_channel_delete", self)
+
+
+class FakeGuild:
+    def __init__(self, bot, name="Bench"):
+        self.bot, self.http = bot, bot.http
+        self.id, self.name = snowflake(), name
+        self.icon = None
+        self.filesize_limit = 25 * 1024 * 1024
+        self.channels, self.members, self.roles = {}, {}, {}
+        self.emojis = []
+        self.default_role = FakeRole("@everyone")
+
+    @property
+    def categories(self): return [c for c in self.channels.values() if isinstance(c, FakeCategory)]
+
+    def get_channel(self, channel_id): return self.channels.get(channel_id)
+
+    def get_member(self, member_id): return self.members.get(member_id)
+
+    async def fetch_member(self, member_id):
+        await self.http.request(Route("GET", "/guilds/{guild_id}/members/{user_id}", guild_id=self.id, user_id=member_id))
+        member = self.members.get(member_id)
+        if member is None: raise discord.NotFound(types.SimpleNamespace(status=404, reason="Not Found"), "Unknown Member")
+        return member
+
+    def get_role(self, role_id): return self.roles.get(role_id)
+
+    def get_emoji(self, emoji_id): return None
+
+    def add_role(self, name):
+        role = FakeRole(name)
+        self.roles[role.id] = role
+        return role
+
+    def add_member(self, name, roles=()):
+        member = FakeMember(self, name, roles)
+        self.members[member.id] = member
+        return member
+
+    def add_category(self, name):
+        category = FakeCategory(self, name, len(self.categories))
+        self.channels[category.id] = category
+        return category
+
+    def add_text_channel(self, name, category=None, topic=None):
+        channel = FakeTextChannel(self, name, category, topic)
+        self.channels[channel.id] = channel
+        if category: category.contents.append(channel)
+        return channel
+
+    async def create_text_channel(self, name, category=None, overwrites=None, topic=None, reason=None):
+        await self.http.request(Route("POST", "/guilds/{guild_id}/channels", guild_id=self.id))
+        if category is not None and len(category.contents) >= CATEGORY_LIMIT: raise _category_full_error()
+        channel = self.add_text_channel(name, category, topic)
+        self.bot.dispatch("guild_channel_create", channel)
+        return channel
+
+    async def create_category(self, name, overwrites=None, position=None, reason=None):
+        await self.http.request(Route("POST", "/guilds/{guild_id}/channels", guild_id=self.id))
+        category = self.add_category(name)
+        if position is not None: category.position = position
+        self.bot.dispatch("guild_channel_create", category)
+        return category
+
+
+class FakeBot:
+    # Faz o papel do commands.Bot: canais por ID e entrega de eventos do gateway para a cog.
+    def __init__(self, http):
+        self.http = http
+        self.user = types.SimpleNamespace(id=snowflake(), name="ZEN", display_name="ZEN", bot=True, mention="<@0>",
+                                          display_avatar=types.SimpleNamespace(url="https://cdn.discordapp.com/embed/avatars/0.png"))
+        self.guilds = []
+        self.cogs = []
+
+    def add_view(self, view, message_id=None): pass
+
+    def add_dynamic_items(self, *items): pass
+
+    def remove_dynamic_items(self, *items): pass
+
+    def get_channel(self, channel_id):
+        for guild in self.guilds:
+            if (channel := guild.get_channel(channel_id)) is not None: return channel
+        return None
+
+    def get_guild(self, guild_id): return next((g for g in self.guilds if g.id == guild_id), None)
+
+    # Eventos chegam depois da resposta REST, como no gateway.
+    def dispatch(self, event, *args):
+        for cog in self.cogs:
+            listener = getattr(cog, f"on_{event}", None)
+            if listener is not None: asyncio.create_task(listener(*args))
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self): return self._done
+
+    async def _respond(self):
+        if self._done: raise discord.InteractionResponded(self.interaction)
+        await self.interaction.http.wait()
+        self._done = True
+
+    async def defer(self, ephemeral=False, thinking=False): await self._respond()
+
+    async def send_message(self, content=None, *, embed=None, view=None, ephemeral=False, file=None):
+        await self._respond()
+        embeds, files = _collect(embed, None, file, None)
+        self.interaction.sent.append(FakeMessage(self.interaction.channel, self.interaction.client.user, content, embeds, view, files))
+
+    async def edit_message(self, *, content=None, embed=None, view=None):
+        await self._respond()
+        if self.interaction.message is not None:
+            if embed is not None: self.interaction.message.embeds = [embed]
+            if view is not None: self.interaction.message.view = view
+
+    async def send_modal(self, modal): await self._respond()
+
+
+class FakeFollowup:
+    def __init__(self, interaction): self.interaction = interaction
+
+    async def send(self, content=None, *, embed=None, view=None, ephemeral=False, file=None, wait=False):
+        await self.interaction.http.wait()
+        embeds, files = _collect(embed, None, file, None)
+        message = FakeMessage(self.interaction.channel, self.interaction.client.user, content, embeds, view, files)
+        self.interaction.sent.append(message)
+        return message
+
+
+class FakeInteraction:
+    # Respostas de interação usam o webhook do próprio Discord, fora do HTTPClient do bot:
+    # pagam latência mas não contam como chamada REST do bot.
+    def __init__(self, client, user, channel, message=None, data=None):
+        self.id = snowflake()
+        self.client, self.user, self.channel, self.message = client, user, channel, message
+        self.guild = getattr(channel, "guild", None)
+        self.http = client.http
+        self.data = data or {}
+        self.sent = []
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+    async def edit_original_response(self, *, content=None, embed=None, view=None):
+        await self.http.wait()
+        if self.message is not None and view is not None: self.message.view = view
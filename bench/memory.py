@@ -0,0 +1,108 @@
+"""Compara o uso de memória dos modos de cache de membros (MEMBER_CACHE).
+
+Cada modo roda em um processo separado com um Client configurado como no bot.py. O
+processo recebe o GUILD_CREATE de servidores grandes e, quando o modo pede chunking na
+inicialização, os GUILD_MEMBERS_CHUNK com todos os membros, como o gateway enviaria.
+Depois simula os donos de tickets abertos (membros vindos do payload das interações)
+e mede o RSS.
+
+    python -m bench.memory --members 100000 --guilds 2 --tickets 200
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK_SIZE = 1000
+JOINED_AT = "2024-01-01T00:00:00+00:00"
+
+
+def role_payload(role_id, name, position):
+    return {"id": str(role_id), "name": name, "permissions": "0", "position": position, "color": 0, "hoist": False, "managed": False, "mentionable": False}
+
+
+def member_payload(user_id, roles=()):
+    return {
+        "user": {"id": str(user_id), "username": f"user{user_id}", "global_name": f"User {user_id}", "discriminator": "0", "avatar": None},
+        "roles": [str(r) for r in roles], "joined_at": JOINED_AT, "deaf": False, "mute": False, "flags": 0,
+    }
+
+
+async def measure(mode, members, guilds, tickets):
+    import discord
+    from discord.state import ChunkRequest
+    from utils.members import member_cache_options, rss_bytes
+
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    client = discord.Client(intents=intents, **member_cache_options(mode, intents))
+    state = client._connection
+    gc.collect()
+    baseline = rss_bytes()
+
+    owners = {}
+    for g in range(guilds):
+        guild_id = 1_000_000 + g * 10_000_000
+        staff_role = guild_id + 1
+        guild = state._add_guild_from_data({
+            "id": str(guild_id), "name": f"Servidor {g}", "member_count": members, "large": True,
+            "roles": [role_payload(guild_id, "@everyone", 0), role_payload(staff_role, "Staff", 1)],
+            "channels": [], "members": [], "emojis": [], "stickers": [], "features": [],
+        })
+        # O que o discord.py faz no GUILD_CREATE quando chunk_guilds_at_startup está ligado.
+        if state._guild_needs_chunking(guild):
+            request = ChunkRequest(guild.id, 0, asyncio.get_running_loop(), state._get_guild, cache=state.member_cache_flags.joined)
+            state._chunk_requests[request.nonce] = request
+            count = (members + CHUNK_SIZE - 1) // CHUNK_SIZE
+            for index in range(count):
+                start = guild_id + 100 + index * CHUNK_SIZE
+                chunk = [member_payload(user_id, [staff_role] if user_id % 500 == 0 else ()) for user_id in range(start, min(start + CHUNK_SIZE, guild_id + 100 + members))]
+                state.parse_guild_members_chunk({"guild_id": str(guild_id), "members": chunk, "chunk_index": index, "chunk_count": count, "nonce": request.nonce})
+        # Donos de tickets abertos, guardados pela cog (OPEN_TICKETS.members) nos dois modos.
+        for user_id in range(guild_id + 100, guild_id + 100 + tickets):
+            owners[(guild_id, user_id)] = discord.Member(data=member_payload(user_id), guild=guild, state=state)
+
+    gc.collect()
+    rss = rss_bytes()
+    return {
+        "mode": mode, "rss": rss, "delta": rss - baseline if rss is not None and baseline is not None else None,
+        "cached": sum(len(guild.members) for guild in state.guilds), "users": len(state._users), "owners": len(owners),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o RSS dos modos de cache de membros.")
+    parser.add_argument("--members", type=int, default=100_000, help="membros por servidor")
+    parser.add_argument("--guilds", type=int, default=1, help="quantidade de servidores")
+    parser.add_argument("--tickets", type=int, default=100, help="tickets abertos por servidor")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, ROOT)
+        print(json.dumps(asyncio.run(measure(args.child, args.members, args.guilds, args.tickets))))
+        return
+
+    from utils.members import MEMBER_CACHE_MODES, format_bytes
+    results = []
+    for mode in MEMBER_CACHE_MODES:
+        command = [sys.executable, "-m", "bench.memory", "--child", mode, "--members", str(args.members), "--guilds", str(args.guilds), "--tickets", str(args.tickets)]
+        output = subprocess.run(command, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{args.guilds} servidor(es) · {args.members} membros cada · {args.tickets} tickets abertos cada\n")
+    print(f"{'modo':<10}{'membros em cache':>18}{'usuários':>10}{'RSS':>12}{'acréscimo':>12}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['cached']:>18}{r['users']:>10}{format_bytes(r['rss']):>12}{format_bytes(r['delta']):>12}")
+    full, tickets = results
+    if full["rss"] is not None and tickets["rss"] is not None:
+        print(f"\nDiferença de RSS: {format_bytes(full['rss'] - tickets['rss'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Benchmark offline do ciclo de vida dos tickets.
+
+Executa os callbacks reais de TicketPanelView, TicketActionsView e FeedbackButton contra
+um servidor falso em memória (bench/fake_discord.py), com latência e 429 configuráveis,
+e mede vazão e latência dos fluxos de abrir, assumir, fechar e avaliar.
+
+    python -m bench.run --users 50 --messages 20 --latency 80 --rate-limit 0.02
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLOWS = ("open", "claim", "close", "review")
+
+
+def percentile(values, fraction):
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class Results:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.last_error = {}
+
+    async def timed(self, flow, coro):
+        start = time.perf_counter()
+        try: value = await coro
+        except Exception as e:
+            self.errors[flow] += 1
+            self.last_error[flow] = f"{type(e).__name__}: {e}"
+            return None
+        self.samples[flow].append((start, time.perf_counter()))
+        return value if value is not None else True
+
+    def lines(self):
+        lines = [f"{'fluxo':<8}{'ok':>6}{'erros':>7}{'vazão/s':>10}{'p50':>10}{'p99':>10}{'máx':>10}"]
+        for flow in FLOWS:
+            samples = self.samples[flow]
+            durations = [end - start for start, end in samples]
+            span = max(end for _, end in samples) - min(start for start, _ in samples) if samples else 0
+            fmt = lambda v: f"{v * 1000:.0f}ms" if v is not None else "-"
+            lines.append(
+                f"{flow:<8}{len(samples):>6}{self.errors[flow]:>7}{(len(samples) / span if span else 0):>10.2f}"
+                f"{fmt(percentile(durations, 0.5)):>10}{fmt(percentile(durations, 0.99)):>10}{fmt(max(durations, default=None)):>10}"
+            )
+        for flow, error in self.last_error.items(): lines.append(f"último erro em {flow}: {error}")
+        return lines
+
+
+def find_item(view, custom_id):
+    # Aceita o custom_id exato ou só o prefixo (botões dinâmicos levam o ID do rascunho).
+    for item in view.children:
+        item_id = getattr(item, "custom_id", None) or ""
+        if item_id == custom_id or item_id.startswith(f"{custom_id}:"): return item
+    raise LookupError(f"botão {custom_id} não encontrado")
+
+
+async def run(args):
+    # Importados só aqui: a cog abre tickets.db e transcripts/ no diretório atual.
+    import cogs.tickets as tickets
+    from utils.metrics import METRICS
+    from bench.fake_discord import FakeBot, FakeGuild, FakeHTTP, FakeInteraction, FakeMessage
+
+    tickets.CLOSE_DELAY = args.close_delay
+    rng = random.Random(args.seed)
+    http = FakeHTTP(args.latency / 1000, args.jitter / 1000, args.rate_limit, args.retry_after, args.seed)
+    METRICS.instrument_http(http)
+    bot = FakeBot(http)
+    guild = FakeGuild(bot)
+    bot.guilds.append(guild)
+
+    staff_role = guild.add_role("Staff")
+    open_category, claimed_category = guild.add_category("Tickets"), guild.add_category("Assumidos")
+    panel_channel = guild.add_text_channel("atendimento")
+    tickets.save_config(guild.id, {
+        "staff_role_id": staff_role.id, "category_open_id": open_category.id, "category_claimed_id": claimed_category.id,
+        "transcript_channel_id": guild.add_text_channel("transcripts").id, "feedback_channel_id": guild.add_text_channel("avaliacoes").id,
+    })
+    staff = [guild.add_member(f"staff{i}", roles=[staff_role]) for i in range(args.staff)]
+    users = [guild.add_member(f"user{i}") for i in range(args.users)]
+
+    cog = tickets.TicketSystem(bot)
+    bot.cogs.append(cog)
+    await tickets.CATEGORIES.load(bot.guilds)
+    await cog.start_close_queue()
+    panel = tickets.TicketPanelView()
+    results = Results()
+
+    async def open_ticket(user):
+        await find_item(panel, "ticket_open_btn").callback(FakeInteraction(bot, user, panel_channel))
+        channel = guild.get_channel(tickets.OPEN_TICKETS.get(guild.id, user.id))
+        if channel is None: raise RuntimeError("ticket não foi criado")
+        return channel
+
+    async def click(member, channel, message, custom_id):
+        view = tickets.TicketActionsView()
+        await find_item(view, custom_id).callback(FakeInteraction(bot, member, channel, message))
+
+    async def close_ticket(member, user, channel, message):
+        await click(member, channel, message, "close_btn")
+        return await asyncio.wait_for(user.dms.get(), args.timeout)
+
+    async def review(user, dm):
+        stars = rng.randint(1, 5)
+        star = find_item(dm.view, "fb:star")
+        custom_id = f"{star.custom_id.rsplit(':', 1)[0]}:{stars}"
+        await dispatch(user, dm, custom_id)
+        await dispatch(user, dm, find_item(dm.view, "fb:finish").custom_id)
+
+    # Como o discord.py faz com DynamicItem: recria o botão a partir do custom_id recebido.
+    async def dispatch(user, message, custom_id):
+        interaction = FakeInteraction(bot, user, message.channel, message, {"custom_id": custom_id})
+        item = await tickets.FeedbackButton.from_custom_id(interaction, None, tickets.FeedbackButton.__discord_ui_compiled_template__.fullmatch(custom_id))
+        await item.callback(interaction)
+
+    async def lifecycle(user):
+        member = rng.choice(staff)
+        channel = await results.timed("open", open_ticket(user))
+        if not channel: return
+        for i in range(args.messages):
+            author = user if i % 2 == 0 else member
+            await cog.on_message(FakeMessage(channel, author, f"Mensagem {i} do atendimento. " * 4))
+            await asyncio.sleep(0)
+        welcome = channel.messages[0]
+        if not await results.timed("claim", click(member, channel, welcome, "claim_btn")): return
+        dm = await results.timed("close", close_ticket(member, user, channel, welcome))
+        if dm: await results.timed("review", review(user, dm))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(lifecycle(user) for user in users))
+    # Espera o fim da fila de fechamento e das exclusões agendadas (CLOSE_DELAY).
+    deadline = time.perf_counter() + args.timeout
+    while (tickets.OPEN_TICKETS.by_channel or len(tickets.DELETIONS)) and time.perf_counter() < deadline: await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    workers = len(tickets.CLOSE_QUEUE.workers)
+    await cog.cog_unload()
+
+    lines = [
+        f"{args.users} usuários · {args.messages} mensagens/ticket · {args.staff} staffs · latência {args.latency:.0f}±{args.jitter:.0f}ms · "
+        f"429 p={args.rate_limit} ({args.retry_after}s) · criação {tickets.TICKET_SCHEDULER.rate}/s rajada {tickets.TICKET_SCHEDULER.burst} · "
+        f"workers de fechamento {workers}",
+        "",
+        *results.lines(),
+        "",
+        f"Chamadas REST: {http.calls} ({http.rate_limited} com 429) · tempo total {elapsed:.2f}s",
+    ]
+    if args.metrics: lines += ["", *METRICS.report_lines()]
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do ciclo de vida dos tickets.")
+    parser.add_argument("--users", type=int, default=20, help="usuários abrindo tickets ao mesmo tempo")
+    parser.add_argument("--messages", type=int, default=20, help="mensagens por ticket")
+    parser.add_argument("--staff", type=int, default=5, help="membros da equipe")
+    parser.add_argument("--latency", type=float, default=50, help="latência média por chamada (ms)")
+    parser.add_argument("--jitter", type=float, default=20, help="variação da latência (ms)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probabilidade de 429 por chamada REST")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry_after dos 429 injetados (s)")
+    parser.add_argument("--create-rate", type=float, help="TICKET_CREATE_RATE (tickets/s por servidor)")
+    parser.add_argument("--create-burst", type=int, help="TICKET_CREATE_BURST")
+    parser.add_argument("--close-workers", type=int, help="CLOSE_WORKERS")
+    parser.add_argument("--close-delay", type=float, default=0, help="espera antes de apagar o canal (padrão do bot: 5s)")
+    parser.add_argument("--timeout", type=float, default=300, help="tempo máximo de espera por fluxo (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--metrics", action="store_true", help="inclui o relatório de métricas por handler")
+    parser.add_argument("--output", help="também grava o relatório neste arquivo")
+    parser.add_argument("--keep", action="store_true", help="mantém o diretório temporário (banco e logs)")
+    args = parser.parse_args()
+
+    for name, value in (("TICKET_CREATE_RATE", args.create_rate), ("TICKET_CREATE_BURST", args.create_burst), ("CLOSE_WORKERS", args.close_workers)):
+        if value is not None: os.environ[name] = str(value)
+    output = os.path.abspath(args.output) if args.output else None
+
+    workdir = tempfile.mkdtemp(prefix="zen-bench-")
+    cwd = os.getcwd()
+    sys.path.insert(0, ROOT)
+    os.symlink(os.path.join(ROOT, "emojis"), os.path.join(workdir, "emojis"))
+    os.chdir(workdir)
+    try: lines = asyncio.run(run(args))
+    finally:
+        os.chdir(cwd)
+        if args.keep: print(f"Arquivos do benchmark em {workdir}")
+        else: shutil.rmtree(workdir, ignore_errors=True)
+
+    report = "\n".join(lines)
+    print(report)
+    if output:
+        with open(output, "w", encoding="utf-8") as f: f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 import os
+import time
+import json
+import hashlib
 import discord
 import asyncio
 import logging
@@ -6,26 +9,54 @@ from discord.ext import commands
 from dotenv import load_dotenv
 from colorama import init, Fore, Style
 import aioconsole
+from utils.metrics import METRICS
+from utils.logs import setup_logging
+from utils.members import member_cache_options, memory_report
 
+STARTED = time.perf_counter()
 init(autoreset=True)
+load_dotenv()
+
+# Modo cluster: o launcher.py define CLUSTER_ID e os shards de cada processo.
+CLUSTER_ID = os.getenv('CLUSTER_ID')
+SHARD_COUNT = os.getenv('SHARD_COUNT')
+SHARD_IDS = [int(i) for i in os.getenv('SHARD_IDS', '').split(',') if i.strip()]
 
-# Configuração de Logs
-logging.basicConfig(
-    level=logging.INFO,
-    format=f'{Fore.CYAN}[%(asctime)s]{Style.RESET_ALL} {Fore.WHITE}[%(levelname)s]{Style.RESET_ALL} %(message)s',
-    datefmt='%H:%M:%S'
+# Configuração de Logs: escrita numa thread separada; LOG_FILE liga a saída JSON com rotação.
+# No cluster cada processo grava o próprio arquivo (a rotação não é segura entre processos).
+LOG_FILE = os.getenv('LOG_FILE')
+if LOG_FILE and CLUSTER_ID is not None:
+    base, ext = os.path.splitext(LOG_FILE)
+    LOG_FILE = f"{base}.c{CLUSTER_ID}{ext}"
+setup_logging(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(), json_file=LOG_FILE, cluster_id=CLUSTER_ID,
+    max_bytes=int(os.getenv('LOG_MAX_MB', '10')) * 1024 * 1024, backups=int(os.getenv('LOG_BACKUPS', '5'))
 )
 log = logging.getLogger("ZEN_BOT")
 
-load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
+METRICS_PORT = os.getenv('METRICS_PORT')
+# "full" guarda todos os membros; "tickets" só os donos de tickets abertos (servidores grandes).
+MEMBER_CACHE = os.getenv('MEMBER_CACHE', 'full').strip().lower()
+# Hash do último payload de comandos enviado ao Discord.
+COMMAND_HASH_FILE = "command_tree.sha256"
 
 # Intents
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
+cache_options = member_cache_options(MEMBER_CACHE, intents)
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+# SHARD_COUNT=auto usa a quantidade recomendada pelo Discord; um número fixa o total.
+if SHARD_COUNT:
+    bot = commands.AutoShardedBot(
+        command_prefix='!', intents=intents,
+        shard_count=None if SHARD_COUNT == 'auto' else int(SHARD_COUNT),
+        shard_ids=SHARD_IDS or None, **cache_options
+    )
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents, **cache_options)
+METRICS.instrument_http(bot.http)
 
 def print_banner():
     banner = r"""
@@ -47,14 +78,35 @@ async def load_extensions():
         os.makedirs('./cogs')
         return
 
-    for filename in os.listdir('./cogs'):
+    timings = []
+    for filename in sorted(os.listdir('./cogs')):
         if filename.endswith('.py'):
             extension_name = f'cogs.{filename[:-3]}'
+            start = time.perf_counter()
             try:
                 await bot.load_extension(extension_name)
                 log.info(f"{Fore.GREEN}Extensão '{extension_name}' carregada.{Style.RESET_ALL}")
             except Exception as e:
                 log.error(f"{Fore.RED}Falha ao carregar '{extension_name}': {e}{Style.RESET_ALL}")
+            timings.append((extension_name, time.perf_counter() - start))
+
+    log.info(f"Tempo de inicialização: {time.perf_counter() - STARTED:.2f}s desde o início do processo")
+    for extension_name, elapsed in sorted(timings, key=lambda item: -item[1]):
+        log.info(f"  {extension_name}: {elapsed * 1000:.0f}ms")
+
+# Sincroniza os comandos só quando o payload muda (o Discord limita as sincronizações globais).
+async def sync_commands():
+    payload = [command.to_dict(bot.tree) for command in bot.tree.get_commands()]
+    digest = hashlib.sha256(json.dumps([bot.application_id, payload], sort_keys=True, default=str).encode()).hexdigest()
+    try:
+        with open(COMMAND_HASH_FILE, "r", encoding="utf-8") as f: previous = f.read().strip()
+    except OSError: previous = None
+    if digest == previous:
+        log.info(f"Comandos Slash inalterados ({len(payload)}), sincronização ignorada.")
+        return
+    synced = await bot.tree.sync()
+    with open(COMMAND_HASH_FILE, "w", encoding="utf-8") as f: f.write(digest)
+    log.info(f"Comandos Slash sincronizados: {len(synced)}")
 
 async def console_listener():
     await bot.wait_until_ready()
@@ -87,6 +139,7 @@ async def console_listener():
                                 log.info(f"{Fore.GREEN}Recarregado: {ext_name}{Style.RESET_ALL}")
                             except Exception as e:
                                 log.error(f"{Fore.RED}Erro em {ext_name}: {e}{Style.RESET_ALL}")
+                    await sync_commands()
 
                 else:
                     try:
@@ -102,16 +155,90 @@ async def console_listener():
                             log.error(f"{Fore.RED}Erro ao carregar: {e}{Style.RESET_ALL}")
                     except Exception as e:
                         log.error(f"{Fore.RED}Erro ao recarregar '{target}': {e}{Style.RESET_ALL}")
+                    await sync_commands()
 
             elif command == "stop" or command == "exit":
                 log.info("Desligando o bot via console...")
                 await bot.close()
                 break
             
+            elif command == "ticket_stats":
+                cog = bot.get_cog("TicketSystem")
+                if not cog:
+                    print(f"{Fore.RED}A cog de tickets não está carregada.{Style.RESET_ALL}")
+                    continue
+                try:
+                    days = int(args[1]) if len(args) > 1 else 30
+                    staff = int(args[2].strip("<@!>")) if len(args) > 2 and args[2] != "-" else None
+                    guild_ids = [int(args[3])] if len(args) > 3 else [g.id for g in bot.guilds]
+                except ValueError:
+                    print(f"{Fore.RED}Uso: ticket_stats [dias] [id_do_staff|-] [id_do_servidor]{Style.RESET_ALL}")
+                    continue
+                for guild_id in guild_ids:
+                    guild = bot.get_guild(guild_id)
+                    print(f"\n{Fore.CYAN}--- {guild.name if guild else guild_id}: estatísticas ({days} dias) ---{Style.RESET_ALL}")
+                    for line in cog.stats_report(guild_id, days, staff): print(f" {line}")
+                print()
+
+            elif command == "stats":
+                print(f"\n{Fore.CYAN}--- Métricas dos handlers ---{Style.RESET_ALL}")
+                for line in METRICS.report_lines(): print(f" {line}")
+                print()
+
+            elif command == "bulk":
+                cog = bot.get_cog("TicketSystem")
+                if not cog:
+                    print(f"{Fore.RED}A cog de tickets não está carregada.{Style.RESET_ALL}")
+                    continue
+                if len(args) > 1 and args[1] == "status":
+                    print(f"\n{Fore.CYAN}--- Operações em lote ---{Style.RESET_ALL}")
+                    for line in await cog.bulk_status_lines(): print(f" {line}")
+                    print()
+                    continue
+                if len(args) > 1 and args[1] == "cancel":
+                    try: operation = await cog.cancel_bulk(int(args[2].lstrip("#")))
+                    except (IndexError, ValueError):
+                        print(f"{Fore.RED}Uso: bulk cancel <id>{Style.RESET_ALL}")
+                        continue
+                    if operation: print(f"Lote #{operation['id']} cancelado.")
+                    else: print(f"{Fore.RED}Nenhum lote em andamento com esse número.{Style.RESET_ALL}")
+                    continue
+                try:
+                    action = args[1]
+                    options = dict(arg.split("=", 1) for arg in args[2:])
+                    days = int(options["dias"]) if "dias" in options else None
+                    staff = int(options["staff"].strip("<@!>")) if "staff" in options else None
+                    to = int(options["para"].strip("<@!>")) if "para" in options else None
+                    guild_ids = [int(options["servidor"])] if "servidor" in options else [g.id for g in bot.guilds]
+                except (IndexError, ValueError):
+                    print(f"{Fore.RED}Uso: bulk <close|export|reassign|move|status|cancel> [dias=N] [staff=ID] [para=ID] [destino=open|claimed] [servidor=ID]{Style.RESET_ALL}")
+                    continue
+                for guild_id in guild_ids:
+                    guild = bot.get_guild(guild_id)
+                    if not guild: continue
+                    try: operation, _ = await cog.start_bulk(guild, action, bot.user.id, idle_days=days, staff_id=staff, to_id=to, target=options.get("destino"))
+                    except ValueError as e:
+                        print(f"{Fore.RED}{e}{Style.RESET_ALL}")
+                        break
+                    if operation: print(f"Lote #{operation['id']} iniciado em {guild.name}; o progresso aparece no log ('bulk status' para acompanhar).")
+                    else: print(f"Nenhum ticket aberto corresponde aos filtros em {guild.name}.")
+
+            elif command == "memory":
+                cog = bot.get_cog("TicketSystem")
+                print(f"\n{Fore.CYAN}--- Memória ---{Style.RESET_ALL}")
+                for line in memory_report(bot, MEMBER_CACHE, cog.memory_lines() if cog else ()): print(f" {line}")
+                print()
+
             elif command == "help":
                 print(f"\n{Fore.CYAN}--- Comandos do Console ---{Style.RESET_ALL}")
                 print(f" {Fore.YELLOW}reload all{Style.RESET_ALL}         : Recarrega TODAS as cogs.")
                 print(f" {Fore.YELLOW}reload <nome>{Style.RESET_ALL}      : Recarrega um arquivo específico (ex: ticket).")
+                print(f" {Fore.YELLOW}ticket_stats [d] [id]{Style.RESET_ALL}: Estatísticas da equipe nos últimos d dias.")
+                print(f" {Fore.YELLOW}stats{Style.RESET_ALL}              : Latência, erros e chamadas REST por handler.")
+                print(f" {Fore.YELLOW}memory{Style.RESET_ALL}             : RSS do processo e membros em cache.")
+                print(f" {Fore.YELLOW}bulk <ação> [...]{Style.RESET_ALL}  : Fecha/exporta/reatribui/move tickets em lote (ex: bulk close dias=7).")
+                print(f" {Fore.YELLOW}bulk status{Style.RESET_ALL}        : Progresso das operações em lote.")
+                print(f" {Fore.YELLOW}bulk cancel <id>{Style.RESET_ALL}   : Interrompe uma operação em lote em andamento.")
                 print(f" {Fore.YELLOW}stop{Style.RESET_ALL}               : Desliga o bot.")
                 print(f" {Fore.YELLOW}clear{Style.RESET_ALL}              : Limpa o terminal.\n")
             
@@ -125,25 +252,37 @@ async def console_listener():
         except Exception as e:
             log.error(f"Erro no console: {e}")
 
+# on_ready também dispara a cada reconexão do gateway: só a primeira faz o trabalho de inicialização.
+first_ready = True
+
 @bot.event
 async def on_ready():
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print_banner()
-    log.info(f'{Fore.GREEN}Bot conectado como: {bot.user}{Style.RESET_ALL}')
+    global first_ready
+    if not first_ready:
+        log.info(f"Reconectado como: {bot.user}")
+        return
+    first_ready = False
+    if CLUSTER_ID is None:
+        os.system('cls' if os.name == 'nt' else 'clear')
+        print_banner()
+    shards = f" · shards {sorted(bot.shards)} de {bot.shard_count}" if bot.shard_count else ""
+    log.info(f'{Fore.GREEN}Bot conectado como: {bot.user}{Style.RESET_ALL} (pronto em {time.perf_counter() - STARTED:.2f}s{shards} · {len(bot.guilds)} servidores)')
     # Custom status removido
+    # Comandos são globais: no cluster, só o processo 0 sincroniza.
+    if CLUSTER_ID not in (None, '0'): return
     try:
-        synced = await bot.tree.sync()
-        log.info(f"Comandos Slash sincronizados: {len(synced)}")
+        await sync_commands()
     except Exception as e:
         log.error(f"Erro ao sincronizar comandos: {e}")
 
 async def main():
     async with bot:
+        # Cada processo do cluster usa a porta base + o número do cluster.
+        if METRICS_PORT: await METRICS.start_server("127.0.0.1", int(METRICS_PORT) + int(CLUSTER_ID or 0))
         await load_extensions()
-        await asyncio.gather(
-            bot.start(TOKEN),
-            console_listener()
-        )
+        # Os processos do cluster não têm terminal próprio; o console fica só no modo simples.
+        tasks = [bot.start(TOKEN)] if CLUSTER_ID is not None else [bot.start(TOKEN), console_listener()]
+        await asyncio.gather(*tasks)
 
 if __name__ == '__main__':
     try:
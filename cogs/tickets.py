@@ -1,28 +1,77 @@
 import discord
 from discord import ui, app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
-import io
 import os
 import logging
 import random
 import string
-import json
+import time
 from datetime import datetime
-import chat_exporter
+import importlib
+from utils.store import TicketStore, LEGACY_GUILD
+from utils.transcript import Transcript
+from utils.close_queue import CloseJobQueue, DEFAULT_WORKERS
+from utils.delete_queue import DeletionScheduler
+from utils.bulk import BulkRunner, BulkSkip, DEFAULT_CONCURRENCY as DEFAULT_BULK_CONCURRENCY
+from utils.recorder import TranscriptRecorder, render_transcript
+from utils.reviews import ReviewIndex
+from utils.analytics import StaffStats, staff_key, DAY
+from utils.assets import AssetRegistry
+from utils.emoji_installer import EmojiInstaller
+from utils.categories import CategoryPool, is_category_full_error
+from utils.metrics import METRICS
+from utils.logs import traced, set_trace, current_trace
+from utils.waiters import AttachmentDispatcher, pick_images
+from utils.numbers import NumberAllocator, DEFAULT_BLOCK_SIZE
+from utils.scheduler import AdmissionScheduler, DEFAULT_RATE, DEFAULT_BURST
+
+log = logging.getLogger("ZEN_BOT")
 
 # --- CONFIGURAÇÃO GERAL ---
 THUMBNAIL_ICON_URL = "https://media.discordapp.net/attachments/1431271313481404557/1455378630460047450/unnamed__26_-removebg-preview_1.png"
 ZEN_LINK = "https://dsc.gg/zenstudios"
+# Segundos entre o aviso de fechamento e a exclusão do canal.
+CLOSE_DELAY = 5
+# Avaliações não finalizadas são descartadas depois de 30 dias sem interação.
+FEEDBACK_DRAFT_TTL = 30 * 86400
+# Limites das imagens anexadas a uma avaliação.
+FEEDBACK_MAX_IMAGES = 10
+FEEDBACK_MAX_IMAGE_SIZE = 8 * 1024 * 1024
+FEEDBACK_IMAGE_WINDOW = 60
+# Tickets com histórico recuperado ao mesmo tempo na inicialização.
+CATCH_UP_CONCURRENCY = 4
 
 # Arquivos e Pastas
-CONFIG_FILE = "config.json"
+DB_FILE = "tickets.db"
 EMOJIS_FILE = "emojis.json"
 EMOJIS_DIR = "./emojis" 
 BANNER_FILENAME = "banner-ticket.png" 
+TRANSCRIPTS_DIR = "transcripts"
+EXPORTS_DIR = "exports"
+
+# Arquivos legados (importados para o banco na primeira inicialização)
+CONFIG_FILE = "config.json"
 TICKET_COUNT_FILE = "ticket_count.txt"
 REVIEWS_FILE = "reviews.json"
 
+# --- BANCO DE DADOS ---
+STORE = TicketStore(DB_FILE)
+STORE.import_legacy(CONFIG_FILE, TICKET_COUNT_FILE, REVIEWS_FILE)
+CLOSE_QUEUE = CloseJobQueue(STORE)
+DELETIONS = DeletionScheduler(STORE)
+BULK = BulkRunner(STORE, int(os.getenv("BULK_CONCURRENCY") or DEFAULT_BULK_CONCURRENCY))
+RECORDER = TranscriptRecorder(TRANSCRIPTS_DIR)
+REVIEWS = ReviewIndex()
+STATS = StaffStats()
+CATEGORIES = CategoryPool(STORE)
+ATTACHMENTS = AttachmentDispatcher()
+TICKET_NUMBERS = NumberAllocator(STORE, "ticket", int(os.getenv("TICKET_NUMBER_BLOCK") or DEFAULT_BLOCK_SIZE))
+TICKET_SCHEDULER = AdmissionScheduler(
+    rate=float(os.getenv("TICKET_CREATE_RATE") or DEFAULT_RATE),
+    burst=int(os.getenv("TICKET_CREATE_BURST") or DEFAULT_BURST)
+)
+
 # --- MAPA DE TRADUÇÃO ---
 EMOJI_FILENAME_MAP = {
     "confirm": "certo",
@@ -39,64 +88,152 @@ EMOJI_FILENAME_MAP = {
     "info": "info"
 }
 
+EMOJI_DEFAULTS = {
+    "confirm": "✅", "cancel": "❌", "star": "⭐", "notes": "📝", 
+    "photo": "📷", "discord": "🤖", "minecraft": "🧱", "sites": "🌐", 
+    "others": "📚", "loading": "⌛", "trash": "🗑️", "info": "ℹ️"
+}
+
 # --- GERENCIADOR DE EMOJIS ---
-def load_emojis():
-    if not os.path.exists(EMOJIS_FILE): return {}
-    with open(EMOJIS_FILE, "r", encoding="utf-8") as f: return json.load(f)
-
-def save_emojis_to_file(data):
-    with open(EMOJIS_FILE, "w", encoding="utf-8") as f: json.dump(data, f, indent=4)
-
-EMOJIS = load_emojis()
-
-def get_emoji(logic_key):
-    file_name = EMOJI_FILENAME_MAP.get(logic_key, logic_key)
-    emoji_str = EMOJIS.get(file_name)
-    defaults = {
-        "confirm": "✅", "cancel": "❌", "star": "⭐", "notes": "📝", 
-        "photo": "📷", "discord": "🤖", "minecraft": "🧱", "sites": "🌐", 
-        "others": "📚", "loading": "⌛", "trash": "🗑️", "info": "ℹ️"
-    }
-    if not emoji_str: return defaults.get(logic_key, "❓")
-    if emoji_str.startswith("<"):
-        try: return discord.PartialEmoji.from_str(emoji_str)
-        except: return defaults.get(logic_key, "❓")
-    return emoji_str
+# Emojis e banner são resolvidos uma vez e recarregados pelo watcher da cog quando
+# emojis.json ou a pasta de emojis mudam.
+ASSETS = AssetRegistry(EMOJIS_FILE, EMOJIS_DIR, BANNER_FILENAME, EMOJI_FILENAME_MAP, EMOJI_DEFAULTS)
+ASSETS.reload()
+EMOJI_INSTALLER = EmojiInstaller(STORE, ASSETS, EMOJIS_DIR)
+
+def get_emoji(logic_key): return ASSETS.emoji(logic_key)
+
+# Anexa o banner em memória ao embed; retorna o discord.File a enviar (ou None).
+def attach_banner(embed):
+    file = ASSETS.banner_file()
+    if file: embed.set_image(url=f"attachment://{BANNER_FILENAME}")
+    return file
 
 # --- CONFIGURAÇÃO ---
-def load_config():
-    if not os.path.exists(CONFIG_FILE): return {}
-    with open(CONFIG_FILE, "r") as f: return json.load(f)
+# Cache write-through por servidor: carregado uma vez, atualizado por save_config e
+# recarregado pelo watcher da cog apenas quando o banco é alterado por fora.
+_CONFIG_CACHE = {}
 
-def save_config(data):
-    current_config = load_config()
-    current_config.update(data)
-    with open(CONFIG_FILE, "w") as f: json.dump(current_config, f, indent=4)
+def load_config(guild_id):
+    config = _CONFIG_CACHE.get(guild_id)
+    if config is None: config = _CONFIG_CACHE[guild_id] = {}
+    return config
 
-def get_config(key): return load_config().get(key)
+def save_config(guild_id, data):
+    STORE.set_config(guild_id, data)
+    load_config(guild_id).update(data)
 
-# --- FUNÇÕES AUXILIARES ---
-def get_next_ticket_number():
-    if not os.path.exists(TICKET_COUNT_FILE):
-        with open(TICKET_COUNT_FILE, "w") as f: f.write("0"); return 1
-    with open(TICKET_COUNT_FILE, "r") as f:
-        try: return int(f.read()) + 1
-        except: return 1
+def get_config(guild_id, key): return load_config(guild_id).get(key)
 
-def save_next_ticket_number(number):
-    with open(TICKET_COUNT_FILE, "w") as f: f.write(str(number))
+async def reload_config():
+    global _CONFIG_CACHE, _PANEL_CACHE
+    _CONFIG_CACHE = await asyncio.to_thread(STORE.get_all_configs)
+    _PANEL_CACHE = await asyncio.to_thread(STORE.get_all_panels)
+
+_CONFIG_CACHE = STORE.get_all_configs()
+
+# --- PAINÉIS ---
+# Mensagens de painel por servidor ({message_id: channel_id}), com o mesmo cache
+# write-through da configuração.
+_PANEL_CACHE = STORE.get_all_panels()
+
+def get_panels(guild_id): return _PANEL_CACHE.get(guild_id, {})
+
+async def add_panel(guild_id, channel_id, message_id):
+    await asyncio.to_thread(STORE.add_panel, guild_id, channel_id, message_id)
+    _PANEL_CACHE.setdefault(guild_id, {})[message_id] = channel_id
+
+async def remove_panel(guild_id, message_id):
+    if _PANEL_CACHE.get(guild_id, {}).pop(message_id, None) is not None: await asyncio.to_thread(STORE.remove_panel, message_id)
+
+# O emoji do botão fica gravado na mensagem: após instalar emojis, os painéis do servidor
+# são editados com a view atual. Painéis apagados saem do cache. Retorna quantos mudaram.
+async def refresh_panels(guild):
+    updated = 0
+    for message_id, channel_id in list(get_panels(guild.id).items()):
+        channel = guild.get_channel(channel_id)
+        if channel is None:
+            await remove_panel(guild.id, message_id)
+            continue
+        try:
+            await channel.get_partial_message(message_id).edit(view=TicketPanelView())
+            updated += 1
+        except discord.NotFound: await remove_panel(guild.id, message_id)
+        except discord.HTTPException as e: log.warning(f"Não foi possível atualizar o painel {message_id}: {e}")
+    return updated
+
+# --- FUNÇÕES AUXILIARES ---
+def parse_ticket_topic(topic):
+    # Formato: "Ticket ID: #<número> | Aberto por: <id do usuário>"
+    try:
+        number, owner = topic.split(" | ")
+        return int(number.replace("Ticket ID: #", "")), int(owner.replace("Aberto por: ", ""))
+    except (AttributeError, ValueError): return None
 
 def generate_review_id():
     return f"#{''.join(random.choices(string.ascii_letters + string.digits, k=7))}"
 
-def save_review(review_id, data):
-    reviews = {}
-    if os.path.exists(REVIEWS_FILE):
-        with open(REVIEWS_FILE, "r", encoding="utf-8") as f:
-            try: reviews = json.load(f)
-            except: pass
-    reviews[review_id] = data
-    with open(REVIEWS_FILE, "w", encoding="utf-8") as f: json.dump(reviews, f, indent=4)
+async def save_review(review_id, data):
+    created_at = await asyncio.to_thread(STORE.add_review, review_id, data)
+    REVIEWS.add(review_id, data["guild_id"], created_at, data["staff"], data["tid"], data["stars"])
+    STATS.add_review(data["guild_id"], data["staff"], created_at, data["stars"])
+
+# --- ÍNDICE DE TICKETS ABERTOS ---
+# Mapeia (servidor, usuário) -> canal do ticket aberto (em qualquer categoria). Montado
+# na inicialização e mantido pelos eventos de canal e pelos botões de abrir/fechar.
+# Com MEMBER_CACHE=tickets o discord.py não guarda membros: o dono que abriu o ticket
+# fica em members até o fechamento, e os demais são buscados pelo ID salvo no banco.
+class OpenTicketIndex:
+    def __init__(self):
+        self.by_user = {}
+        self.by_channel = {}
+        self.members = {}
+
+    def add(self, guild_id, user_id, channel_id, member=None):
+        self.by_user[(guild_id, user_id)] = channel_id
+        self.by_channel[channel_id] = (guild_id, user_id)
+        if member is not None: self.members[channel_id] = member
+
+    def remove_channel(self, channel_id):
+        self.members.pop(channel_id, None)
+        key = self.by_channel.pop(channel_id, None)
+        if key is not None and self.by_user.get(key) == channel_id: del self.by_user[key]
+        return key
+
+    def get(self, guild_id, user_id): return self.by_user.get((guild_id, user_id))
+
+    def clear(self):
+        self.by_user.clear()
+        self.by_channel.clear()
+        self.members.clear()
+
+OPEN_TICKETS = OpenTicketIndex()
+
+# Tickets abertos antes do banco existir ganham um registro a partir do tópico do canal.
+async def get_ticket_record(channel):
+    ticket = await asyncio.to_thread(STORE.get_ticket, channel.id)
+    if ticket or not (parsed := parse_ticket_topic(channel.topic)): return ticket
+    await asyncio.to_thread(STORE.add_ticket, channel.guild.id, channel.id, parsed[0], parsed[1])
+    return await asyncio.to_thread(STORE.get_ticket, channel.id)
+
+# Tasks de segundo plano não têm quem espere por elas: a falha vai para o log.
+def log_task_failure(task):
+    if not task.cancelled() and task.exception(): log.error(f"Falha na task {task.get_name()}", exc_info=task.exception())
+
+# Coloca o canal em uma categoria do pool da base, criando uma categoria extra quando
+# todas estão no limite de 50 canais. action recebe a categoria escolhida. Retorna None
+# sem chamar action se a categoria base não existe mais.
+async def place_in_pool(guild, base_id, action):
+    for attempt in range(2):
+        category = await CATEGORIES.acquire(guild, base_id)
+        if category is None:
+            log.warning(f"Categoria {base_id} não existe mais no servidor {guild.id}; canal não movido.")
+            return None
+        try: return await action(category)
+        except discord.HTTPException as e:
+            CATEGORIES.release(category.id)
+            if attempt or not is_category_full_error(e): raise
+            CATEGORIES.mark_full(category.id)
 
 # --- WIZARD DE CONFIGURAÇÃO ---
 
@@ -203,121 +340,149 @@ class ConfigWizardView(ui.View):
         await self.advance_step(interaction)
 
     async def callback_step_2(self, interaction: discord.Interaction):
-        save_config({"staff_role_id": int(interaction.data['values'][0])})
+        save_config(interaction.guild.id, {"staff_role_id": int(interaction.data['values'][0])})
         await self.advance_step(interaction)
     async def callback_step_3(self, interaction: discord.Interaction):
-        save_config({"category_open_id": int(interaction.data['values'][0])})
+        save_config(interaction.guild.id, {"category_open_id": int(interaction.data['values'][0])})
         await self.advance_step(interaction)
     async def callback_step_4(self, interaction: discord.Interaction):
-        save_config({"category_claimed_id": int(interaction.data['values'][0])})
+        save_config(interaction.guild.id, {"category_claimed_id": int(interaction.data['values'][0])})
         await self.advance_step(interaction)
     async def callback_step_5(self, interaction: discord.Interaction):
-        save_config({"transcript_channel_id": int(interaction.data['values'][0])})
+        save_config(interaction.guild.id, {"transcript_channel_id": int(interaction.data['values'][0])})
         await self.advance_step(interaction)
     async def callback_step_6(self, interaction: discord.Interaction):
-        save_config({"feedback_channel_id": int(interaction.data['values'][0])})
+        save_config(interaction.guild.id, {"feedback_channel_id": int(interaction.data['values'][0])})
         await self.advance_step(interaction)
 
 # --- SISTEMA DE AVALIAÇÃO ---
+# Os botões da DM não guardam estado: a ação e o rascunho vão no custom_id e o resto fica
+# na tabela feedback_drafts. Um único DynamicItem registrado na cog atende todas as DMs,
+# inclusive as enviadas antes de um reinício, e nenhuma view fica presa na memória.
 
-class CommentModal(ui.Modal):
-    def __init__(self, parent_view):
-        super().__init__(title="Deixe seu comentário")
-        self.parent_view = parent_view
-        self.comment = ui.TextInput(label="Comentário", style=discord.TextStyle.paragraph, required=False, max_length=500, default=parent_view.comment_text)
-        self.add_item(self.comment)
+def build_feedback_view(draft):
+    view = ui.View(timeout=None)
+    did = draft["id"]
+    if not draft["stars"]:
+        for i in range(1, 6):
+            view.add_item(FeedbackButton(did, "star", i, label=str(i), emoji=get_emoji('star'), style=discord.ButtonStyle.secondary))
+    else:
+        style_comm = discord.ButtonStyle.success if draft["comment"] else discord.ButtonStyle.secondary
+        view.add_item(FeedbackButton(did, "comment", label="Comentário", emoji=get_emoji('notes'), style=style_comm))
 
-    async def on_submit(self, interaction: discord.Interaction):
-        self.parent_view.comment_text = self.comment.value
-        await interaction.response.defer(ephemeral=True)
-        self.parent_view.update_buttons()
-        await interaction.edit_original_response(view=self.parent_view)
-        await interaction.followup.send(f"{get_emoji('notes')} Comentário salvo!", ephemeral=True)
+        imgs = len(draft["imgs"])
+        style_img = discord.ButtonStyle.success if imgs else discord.ButtonStyle.secondary
+        view.add_item(FeedbackButton(did, "image", label=f"{imgs} Imagens" if imgs else "Anexar Imagens", emoji=get_emoji('photo'), style=style_img))
 
-class FeedbackView(ui.View):
-    def __init__(self, ticket_id, handled_by):
-        super().__init__(timeout=None)
-        self.ticket_id, self.handled_by = ticket_id, handled_by
-        self.step = 1
-        self.service_stars = 0
-        self.image_urls = []
-        self.comment_text = None
-        self.update_buttons()
+        view.add_item(FeedbackButton(did, "finish", label="Finalizar", emoji=get_emoji('confirm'), style=discord.ButtonStyle.success))
+    return view
 
-    def update_buttons(self):
-        self.clear_items()
-        if self.step == 1:
-            for i in range(1, 6):
-                btn = ui.Button(label=str(i), emoji=get_emoji('star'), style=discord.ButtonStyle.secondary, custom_id=f"star_{i}")
-                btn.callback = self.star_callback
-                self.add_item(btn)
-        elif self.step == 2:
-            style_comm = discord.ButtonStyle.success if self.comment_text else discord.ButtonStyle.secondary
-            btn_comm = ui.Button(label="Comentário", emoji=get_emoji('notes'), style=style_comm)
-            btn_comm.callback = self.comment_callback
-            self.add_item(btn_comm)
-            
-            style_img = discord.ButtonStyle.success if len(self.image_urls) > 0 else discord.ButtonStyle.secondary
-            label_img = f"{len(self.image_urls)} Imagens" if len(self.image_urls) > 0 else "Anexar Imagens"
-            btn_img = ui.Button(label=label_img, emoji=get_emoji('photo'), style=style_img)
-            btn_img.callback = self.image_callback
-            self.add_item(btn_img)
-            
-            btn_fin = ui.Button(label="Finalizar", emoji=get_emoji('confirm'), style=discord.ButtonStyle.success)
-            btn_fin.callback = self.finish_callback
-            self.add_item(btn_fin)
+class FeedbackButton(ui.DynamicItem[ui.Button], template=r"fb:(?P<action>star|comment|image|finish):(?P<draft>[0-9]+)(?::(?P<stars>[1-5]))?"):
+    def __init__(self, draft_id, action, stars=None, **button):
+        custom_id = f"fb:{action}:{draft_id}" + (f":{stars}" if stars else "")
+        super().__init__(ui.Button(custom_id=custom_id, **button))
+        self.draft_id, self.action, self.stars = draft_id, action, stars
 
-    async def star_callback(self, interaction: discord.Interaction):
-        self.service_stars = int(interaction.data['custom_id'].split('_')[1])
-        self.step = 2 
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        stars = match["stars"]
+        return cls(int(match["draft"]), match["action"], int(stars) if stars else None)
+
+    @traced
+    async def callback(self, interaction: discord.Interaction):
+        draft = await asyncio.to_thread(STORE.get_feedback_draft, self.draft_id)
+        if not draft or draft["user_id"] != interaction.user.id:
+            return await interaction.response.send_message(f"{get_emoji('cancel')} Esta avaliação já foi enviada ou expirou.", ephemeral=True)
+        set_trace(draft["trace_id"], draft["channel_id"])
+        await getattr(self, f"{self.action}_callback")(interaction, draft)
+
+    async def star_callback(self, interaction, draft):
+        draft = await asyncio.to_thread(STORE.update_feedback_draft, self.draft_id, stars=self.stars)
         embed = interaction.message.embeds[0]
         embed.clear_fields()
         embed.add_field(name="(2/2) Detalhes Finais", value="Se desejar, deixe um comentário ou foto abaixo e clique em **Finalizar**.", inline=False)
-        self.update_buttons()
-        await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(embed=embed, view=build_feedback_view(draft))
+
+    # Aceita vários envios dentro da janela, até o limite de imagens da avaliação.
+    async def image_callback(self, interaction, draft):
+        remaining = FEEDBACK_MAX_IMAGES - len(draft["imgs"])
+        if remaining <= 0:
+            return await interaction.response.send_message(f"{get_emoji('cancel')} Limite de {FEEDBACK_MAX_IMAGES} imagens atingido.", ephemeral=True)
+        await interaction.response.send_message(f"{get_emoji('photo')} **Envie as imagens no chat agora ({FEEDBACK_IMAGE_WINDOW}s, até {remaining}).**", ephemeral=True)
 
-    async def image_callback(self, interaction: discord.Interaction):
-        await interaction.response.send_message(f"{get_emoji('photo')} **Envie as imagens no chat agora (60s).**", ephemeral=True)
+        waiter = ATTACHMENTS.open(interaction.user.id, interaction.channel.id)
+        deadline = time.monotonic() + FEEDBACK_IMAGE_WINDOW
+        received = False
         try:
-            msg = await interaction.client.wait_for('message', check=lambda m: m.author == interaction.user and m.channel == interaction.channel and m.attachments, timeout=60)
-            self.image_urls.extend([a.url for a in msg.attachments])
-            self.update_buttons()
-            try: await interaction.message.edit(view=self)
-            except: pass
-            await interaction.followup.send(f"{get_emoji('confirm')} Salvo!", ephemeral=True)
-        except: await interaction.followup.send(f"{get_emoji('cancel')} Tempo esgotado.", ephemeral=True)
+            while remaining > 0 and (msg := await waiter.next(deadline - time.monotonic())):
+                urls, rejected = pick_images(msg.attachments, remaining, FEEDBACK_MAX_IMAGE_SIZE)
+                if urls:
+                    draft = await asyncio.to_thread(STORE.update_feedback_draft, self.draft_id, new_imgs=urls)
+                    if not draft: return
+                    remaining -= len(urls)
+                    received = True
+                    try: await interaction.message.edit(view=build_feedback_view(draft))
+                    except discord.HTTPException: pass
+                note = f" ({rejected} ignorada(s): só imagens de até {FEEDBACK_MAX_IMAGE_SIZE // (1024 * 1024)} MB, máximo {FEEDBACK_MAX_IMAGES})" if rejected else ""
+                await interaction.followup.send(f"{get_emoji('confirm')} {len(urls)} imagem(ns) salva(s){note}.", ephemeral=True)
+        finally: ATTACHMENTS.close(waiter)
+        if not received and not waiter.replaced: await interaction.followup.send(f"{get_emoji('cancel')} Tempo esgotado.", ephemeral=True)
 
-    async def comment_callback(self, interaction: discord.Interaction): await interaction.response.send_modal(CommentModal(self))
+    async def comment_callback(self, interaction, draft): await interaction.response.send_modal(CommentModal(draft))
 
-    async def finish_callback(self, interaction: discord.Interaction):
-        await interaction.response.defer()
+    @METRICS.handler("finish_callback")
+    async def finish_callback(self, interaction, draft):
+        async with METRICS.step("defer"): await interaction.response.defer()
+        draft = await asyncio.to_thread(STORE.pop_feedback_draft, self.draft_id)
+        if not draft: return
         rid = generate_review_id()
-        rdata = {"user": interaction.user.name, "stars": self.service_stars, "comment": self.comment_text or "Sem comentário", "imgs": self.image_urls, "staff": self.handled_by, "tid": self.ticket_id, "date": str(datetime.now())}
-        save_review(rid, rdata)
+        rdata = {"guild_id": draft["guild_id"], "user": interaction.user.name, "stars": draft["stars"], "comment": draft["comment"] or "Sem comentário", "imgs": draft["imgs"], "staff": draft["handled_by"], "tid": draft["ticket_id"], "date": str(datetime.now())}
+        async with METRICS.step("save_review"): await save_review(rid, rdata)
+        log.info(f"Avaliação {rid} salva: {draft['stars']} estrela(s) para o ticket {draft['ticket_id']}")
         
-        fid = get_config("feedback_channel_id")
-        if fid and (chan := interaction.client.get_channel(int(fid))):
-            color = discord.Color.green() if self.service_stars == 5 else (discord.Color.orange() if self.service_stars >= 3 else discord.Color.red())
+        fid = get_config(draft["guild_id"], "feedback_channel_id")
+        # DMs chegam ao shard 0; em modo cluster o canal pode estar em outro processo.
+        chan = None
+        if fid and not (chan := interaction.client.get_channel(int(fid))):
+            try: chan = await interaction.client.fetch_channel(int(fid))
+            except discord.HTTPException: chan = None
+        if chan:
+            stars = draft["stars"]
+            color = discord.Color.green() if stars == 5 else (discord.Color.orange() if stars >= 3 else discord.Color.red())
             embed = discord.Embed(title="Nova Avaliação", color=color)
             embed.set_author(name=f"{interaction.user.name}", icon_url=interaction.user.avatar.url if interaction.user.avatar else None)
-            embed.add_field(name="Nota", value=f"{str(get_emoji('star')) * self.service_stars}")
-            embed.add_field(name="Staff", value=self.handled_by)
-            embed.add_field(name="Ticket", value=self.ticket_id)
+            embed.add_field(name="Nota", value=f"{str(get_emoji('star')) * stars}")
+            embed.add_field(name="Staff", value=draft["handled_by"])
+            embed.add_field(name="Ticket", value=draft["ticket_id"])
             embed.description = f"**Comentário:**\n```{rdata['comment']}```"
             
             # CORREÇÃO: Usar chan.guild ao invés de interaction.guild
             # Pois a interação acontece na DM (onde guild é None), mas chan é um canal de servidor.
             guild = chan.guild
-            icon_url = guild.icon.url if guild.icon else None
-            embed.set_footer(text=f"© {guild.name}. All rights reserved.", icon_url=icon_url)
+            icon_url = guild.icon.url if getattr(guild, "icon", None) else None
+            embed.set_footer(text=f"© {getattr(guild, 'name', None) or 'Suporte'}. All rights reserved.", icon_url=icon_url)
 
-            if self.image_urls: embed.set_image(url=self.image_urls[0])
-            msg = await chan.send(embed=embed)
+            if draft["imgs"]: embed.set_image(url=draft["imgs"][0])
+            async with METRICS.step("feedback_post"): msg = await chan.send(embed=embed)
             try: await msg.create_thread(name=f"Avaliação {rid}", auto_archive_duration=1440)
             except: pass
         
         await interaction.edit_original_response(embed=discord.Embed(title="Obrigado!", description=f"{get_emoji('confirm')} Avaliação enviada.", color=discord.Color.green()), view=None)
 
+class CommentModal(ui.Modal):
+    def __init__(self, draft):
+        super().__init__(title="Deixe seu comentário", timeout=600)
+        self.draft_id = draft["id"]
+        self.comment = ui.TextInput(label="Comentário", style=discord.TextStyle.paragraph, required=False, max_length=500, default=draft["comment"])
+        self.add_item(self.comment)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        draft = await asyncio.to_thread(STORE.update_feedback_draft, self.draft_id, comment=self.comment.value)
+        if not draft: return
+        await interaction.edit_original_response(view=build_feedback_view(draft))
+        await interaction.followup.send(f"{get_emoji('notes')} Comentário salvo!", ephemeral=True)
+
 # --- VIEWS DE AÇÃO DO TICKET ---
 
 class TicketActionsView(ui.View):
@@ -330,79 +495,226 @@ class TicketActionsView(ui.View):
         except: pass
     
     async def check_staff(self, interaction):
-        sid = get_config("staff_role_id")
-        return False if not sid else interaction.guild.get_role(int(sid)) in interaction.user.roles
+        sid = get_config(interaction.guild.id, "staff_role_id")
+        # Os cargos vêm no payload da interação: funciona sem o membro estar em cache.
+        return False if not sid else interaction.user.get_role(int(sid)) is not None
 
     @ui.button(label="Fechar", style=discord.ButtonStyle.danger, custom_id="close_btn")
+    @traced
+    @METRICS.handler("close_ticket")
     async def close_ticket(self, interaction: discord.Interaction, button: ui.Button):
         if not await self.check_staff(interaction): return await interaction.response.send_message("❌ Apenas Staff.", ephemeral=True)
-        await interaction.response.defer()
-        
-        tid = get_config("transcript_channel_id")
-        tchan = interaction.guild.get_channel(int(tid)) if tid else None
-        
-        try:
-            topic_data = interaction.channel.topic.split(" | ")
-            uid = int(topic_data[1].replace("Aberto por: ", ""))
-            ticket_owner = await interaction.guild.fetch_member(uid)
-        except: ticket_owner = None
-
-        handler = "Staff"
-        async for m in interaction.channel.history(limit=50):
-            if m.embeds and "Ticket Assumido Por" in str(m.embeds[0].to_dict()):
-                for f in m.embeds[0].fields:
-                    if f.name == "Ticket Assumido Por": handler = f.value
-        
-        try:
-            transcript = await chat_exporter.export(interaction.channel, limit=None, bot=interaction.client)
-            tfile = discord.File(io.BytesIO(transcript.encode("utf-8")), filename=f"transcript-{interaction.channel.name}.html")
-            
-            if tchan: 
-                log = discord.Embed(title=f"Ticket Fechado: {interaction.channel.name}", color=discord.Color.red())
-                log.add_field(name="Fechado por", value=interaction.user.mention)
-                log.add_field(name="Dono", value=ticket_owner.mention if ticket_owner else "N/A")
-                await tchan.send(embed=log, file=tfile)
-
-            if ticket_owner:
-                dm_file = discord.File(io.BytesIO(transcript.encode("utf-8")), filename=f"transcript-{interaction.channel.name}.html")
-                embed = discord.Embed(title="Atendimento Finalizado", description="Avalie nosso atendimento abaixo.", color=discord.Color.blue())
-                embed.add_field(name="Atendido por", value=handler)
-                
-                icon_url = interaction.guild.icon.url if interaction.guild.icon else None
-                embed.set_footer(text=f"© {interaction.guild.name}. All rights reserved.", icon_url=icon_url)
-                
-                await ticket_owner.send(embed=embed, file=dm_file, view=FeedbackView(interaction.channel.name, handler))
-        except Exception as e: print(f"Erro transcript/DM: {e}")
-
-        await interaction.followup.send(f"## {get_emoji('cancel')} `Fechando Ticket...`\n\n> O canal será deletado em 5 segundos.")
-        await asyncio.sleep(5)
-        await interaction.channel.delete()
+
+        job, position, created = await CLOSE_QUEUE.submit(interaction.channel.id, interaction.guild.id, interaction.user.id)
+        if not created:
+            return await interaction.response.send_message(f"{get_emoji('loading')} Este ticket já está na fila de fechamento.", ephemeral=True)
+
+        if not CLOSE_QUEUE.started: status = "O bot está iniciando; o fechamento começa em instantes."
+        elif position <= 1: status = "Gerando transcript agora."
+        else: status = f"Posição na fila de fechamento: **{position}**."
+        await interaction.response.send_message(f"## {get_emoji('cancel')} `Fechando Ticket...`\n\n> {status}")
+        ticket = await asyncio.to_thread(STORE.get_ticket, interaction.channel.id)
+        set_trace(ticket and ticket["trace_id"], interaction.channel.id)
+        log.info(f"Fechamento de {interaction.channel.name} pedido por {interaction.user.id} (job {job['id']}, posição {position})")
 
     @ui.button(label="Assumir", style=discord.ButtonStyle.success, custom_id="claim_btn")
+    @traced
+    @METRICS.handler("claim_ticket")
     async def claim_ticket(self, interaction: discord.Interaction, button: ui.Button):
         if not await self.check_staff(interaction): return await interaction.response.send_message("❌ Apenas Staff.", ephemeral=True)
         
-        async for m in interaction.channel.history(limit=5, oldest_first=True):
-            if m.author == interaction.client.user and m.embeds:
-                embed = m.embeds[0]
-                if any(f.name == "Ticket Assumido Por" for f in embed.fields):
-                    return await interaction.response.send_message("Já assumido!", ephemeral=True)
+        # O botão fica na própria mensagem de boas-vindas, então o embed já vem no payload.
+        embed = interaction.message.embeds[0] if interaction.message.embeds else None
+        if embed and any(f.name == "Ticket Assumido Por" for f in embed.fields):
+            return await interaction.response.send_message("Já assumido!", ephemeral=True)
+
+        ticket = await get_ticket_record(interaction.channel)
+        set_trace(ticket and ticket["trace_id"], interaction.channel.id)
+        if ticket:
+            claimed_at = await asyncio.to_thread(STORE.claim_ticket, interaction.channel.id, interaction.user.id)
+            if not claimed_at: return await interaction.response.send_message("Já assumido!", ephemeral=True)
+            STATS.add_claim(interaction.guild.id, interaction.user.id, ticket["created_at"], claimed_at)
+            log.info(f"Ticket {interaction.channel.name} assumido por {interaction.user.id} após {claimed_at - ticket['created_at']:.0f}s")
+
+        button.disabled = True
+        async with METRICS.step("edit_message"):
+            if embed:
                 embed.add_field(name="Ticket Assumido Por", value=interaction.user.mention, inline=False)
-                button.disabled = True
-                await m.edit(embed=embed, view=self)
-                break
+                await interaction.response.edit_message(embed=embed, view=self)
+            else:
+                await interaction.response.edit_message(view=self)
         
-        cat_id = get_config("category_claimed_id")
-        if cat_id: 
-            try: await interaction.channel.edit(category=interaction.guild.get_channel(int(cat_id)))
-            except: pass
+        cat_id = get_config(interaction.guild.id, "category_claimed_id")
+        in_claimed = interaction.channel.category_id in {c.id for c in CATEGORIES.categories(interaction.guild, int(cat_id))} if cat_id else True
+        if not in_claimed:
+            try:
+                async with METRICS.step("move_channel"): await place_in_pool(interaction.guild, int(cat_id), lambda category: interaction.channel.edit(category=category))
+            except discord.HTTPException as e: log.warning(f"Não foi possível mover o ticket {interaction.channel.id} para a categoria de assumidos: {e}")
         
-        await interaction.response.send_message(f"## {get_emoji('confirm')} `Ticket Assumido!`\n\n> O staff {interaction.user.mention} assumiu a responsabilidade por este chamado.")
+        await interaction.followup.send(f"## {get_emoji('confirm')} `Ticket Assumido!`\n\n> O staff {interaction.user.mention} assumiu a responsabilidade por este chamado.")
 
     @ui.button(label="Informações", style=discord.ButtonStyle.secondary, custom_id="info_btn")
     async def info_ticket(self, interaction: discord.Interaction, button: ui.Button):
         await interaction.response.send_message(f"## {get_emoji('info')} `Informações do Ticket`\n\n> **Canal:** {interaction.channel.mention}\n> **ID:** `{interaction.channel.id}`", ephemeral=True)
 
+# --- FECHAMENTO DE TICKETS ---
+async def resolve_member(guild, member_id, cached=None):
+    if member_id is None: return None
+    if member := cached or guild.get_member(member_id): return member
+    try: return await guild.fetch_member(member_id)
+    except discord.HTTPException: return None
+
+# Renderização, codificação e compactação são CPU/disco puros: rodam fora do event loop.
+async def export_transcript(bot, channel, transcript, compression=None):
+    async with METRICS.step("export"):
+        if await asyncio.to_thread(RECORDER.is_complete, channel.id):
+            await asyncio.to_thread(transcript.writelines, render_transcript(RECORDER, channel.id, channel.name))
+        else:
+            # Tickets abertos antes do gravador existir: baixa o histórico inteiro. O
+            # chat_exporter é pesado e só é importado (fora do event loop) na primeira vez.
+            chat_exporter = await asyncio.to_thread(importlib.import_module, "chat_exporter")
+            html = await chat_exporter.export(channel, limit=None, bot=bot)
+            await asyncio.to_thread(transcript.write, html)
+            del html
+        await asyncio.to_thread(transcript.finish, compression or get_config(channel.guild.id, "transcript_compression") or "auto", channel.guild.filesize_limit)
+
+async def upload_transcript(tchan, channel, job, ticket_owner, transcript):
+    log_embed = discord.Embed(title=f"Ticket Fechado: {channel.name}", color=discord.Color.red())
+    log_embed.add_field(name="Fechado por", value=f"<@{job['closed_by']}>")
+    log_embed.add_field(name="Dono", value=ticket_owner.mention if ticket_owner else "N/A")
+    async with METRICS.step("upload"): await tchan.send(embed=log_embed, file=transcript.file())
+
+# Sem transcript (falha no export) a avaliação ainda é enviada, só sem o anexo.
+async def send_feedback_dm(channel, ticket_owner, handler, transcript):
+    guild = channel.guild
+    embed = discord.Embed(title="Atendimento Finalizado", description="Avalie nosso atendimento abaixo.", color=discord.Color.blue())
+    embed.add_field(name="Atendido por", value=handler)
+
+    icon_url = guild.icon.url if guild.icon else None
+    embed.set_footer(text=f"© {guild.name}. All rights reserved.", icon_url=icon_url)
+
+    draft = await asyncio.to_thread(STORE.create_feedback_draft, guild.id, ticket_owner.id, channel.name, handler, channel.id, current_trace())
+    files = {"file": transcript.file()} if transcript else {}
+    async with METRICS.step("dm"): await ticket_owner.send(embed=embed, view=build_feedback_view(draft), **files)
+
+# Executado pelos workers da CLOSE_QUEUE; recebe só IDs para poder ser retomado após um reinício.
+# traced sem interação só isola o contexto: cada job usa o trace do seu ticket.
+@traced
+@METRICS.handler("close_job")
+async def run_close_job(bot, job):
+    set_trace(ticket_id=job["channel_id"])
+    channel = bot.get_channel(job["channel_id"])
+    if not channel:
+        await asyncio.to_thread(STORE.close_ticket, job["channel_id"])
+        OPEN_TICKETS.remove_channel(job["channel_id"])
+        return
+    guild = channel.guild
+
+    tid = get_config(guild.id, "transcript_channel_id")
+    tchan = guild.get_channel(int(tid)) if tid else None
+
+    ticket = await get_ticket_record(channel)
+    set_trace(ticket and ticket["trace_id"])
+    handler = f"<@{ticket['claimed_by']}>" if ticket and ticket["claimed_by"] else "Staff"
+
+    # Etapas independentes rodam juntas e a falha de uma não cancela as outras: o dono é
+    # buscado durante o export, e upload, DM e aviso no canal saem ao mesmo tempo.
+    transcript = Transcript(f"transcript-{channel.name}.html")
+    try:
+        ticket_owner, exported = await asyncio.gather(
+            resolve_member(guild, ticket["owner_id"] if ticket else None, OPEN_TICKETS.members.get(channel.id)),
+            export_transcript(bot, channel, transcript), return_exceptions=True
+        )
+        if isinstance(ticket_owner, BaseException): ticket_owner = None
+        if isinstance(exported, BaseException): log.error(f"Erro ao gerar o transcript de {channel.name}", exc_info=exported)
+        exported = not isinstance(exported, BaseException)
+
+        steps = {"notice": channel.send(f"## {get_emoji('cancel')} `Fechando Ticket...`\n\n> O canal será deletado em {CLOSE_DELAY} segundos.")}
+        if tchan and exported: steps["upload"] = upload_transcript(tchan, channel, job, ticket_owner, transcript)
+        if ticket_owner: steps["dm"] = send_feedback_dm(channel, ticket_owner, handler, transcript if exported else None)
+        results = dict(zip(steps, await asyncio.gather(*steps.values(), return_exceptions=True)))
+    finally: transcript.close()
+    for name, result in results.items():
+        if isinstance(result, BaseException): log.error(f"Erro na etapa {name} do fechamento de {channel.name}", exc_info=result)
+    delivered = exported and not any(isinstance(results.get(name), BaseException) for name in ("upload", "dm"))
+
+    closed_at = await asyncio.to_thread(STORE.close_ticket, channel.id)
+    if ticket and closed_at: STATS.add_close(guild.id, ticket["claimed_by"], ticket["created_at"], closed_at)
+    OPEN_TICKETS.remove_channel(channel.id)
+    # Em caso de falha o log fica em disco para recuperação manual do histórico.
+    if delivered: RECORDER.discard(channel.id)
+    await DELETIONS.schedule(channel.id, guild.id, CLOSE_DELAY)
+    log.info(f"Ticket {channel.name} fechado ({'transcript entregue' if delivered else 'transcript mantido em disco'})")
+
+# Executado pelo DELETIONS quando o prazo de um canal fechado acaba.
+@METRICS.handler("delete_channel")
+async def delete_closed_channel(bot, channel_id):
+    channel = bot.get_channel(channel_id)
+    if channel is None: return
+    try: await channel.delete()
+    except discord.NotFound: pass
+
+# --- OPERAÇÕES EM LOTE ---
+BULK_LABELS = {"close": "fechar", "export": "exportar", "reassign": "reatribuir", "move": "mover"}
+
+# Tickets abertos do servidor que passam nos filtros. A inatividade vem da última mensagem
+# do canal (ID em cache, sem chamada à API) ou da abertura, se o canal não tem mensagens.
+async def select_tickets(guild, idle_days=None, staff_id=None):
+    now = time.time()
+    selected = []
+    for ticket in await asyncio.to_thread(STORE.get_open_tickets_for, guild.id):
+        channel = guild.get_channel(ticket["channel_id"])
+        if channel is None or (staff_id is not None and ticket["claimed_by"] != staff_id): continue
+        if idle_days is not None:
+            last_id = getattr(channel, "last_message_id", None)
+            last = discord.utils.snowflake_time(last_id).timestamp() if last_id else ticket["created_at"]
+            if now - last < idle_days * 86400: continue
+        selected.append(channel.id)
+    return selected
+
+def bulk_channel(bot, channel_id):
+    channel = bot.get_channel(channel_id)
+    if channel is None: raise BulkSkip("canal não existe mais")
+    return channel
+
+# Fechar só enfileira na CLOSE_QUEUE: transcript, DM e exclusão seguem o caminho normal.
+async def bulk_close(bot, operation, channel_id):
+    channel = bulk_channel(bot, channel_id)
+    _, _, created = await CLOSE_QUEUE.submit(channel.id, channel.guild.id, operation["created_by"])
+    if not created: raise BulkSkip("já estava na fila de fechamento")
+
+async def bulk_export(bot, operation, channel_id):
+    channel = bulk_channel(bot, channel_id)
+    path = os.path.join(EXPORTS_DIR, str(channel.guild.id), f"{channel.name}-{channel.id}.html")
+    with Transcript(os.path.basename(path)) as transcript:
+        await export_transcript(bot, channel, transcript, compression="none")
+        await asyncio.to_thread(transcript.save, path)
+
+async def bulk_reassign(bot, operation, channel_id):
+    channel = bulk_channel(bot, channel_id)
+    staff_id = operation["params"]["to"]
+    if not await asyncio.to_thread(STORE.reassign_ticket, channel.id, staff_id): raise BulkSkip("ticket já fechado")
+    ticket = await asyncio.to_thread(STORE.get_ticket, channel.id)
+    if ticket["welcome_message_id"]:
+        try: message = await channel.fetch_message(ticket["welcome_message_id"])
+        except discord.NotFound: message = None
+        if message and message.embeds:
+            embed = message.embeds[0]
+            index = next((i for i, f in enumerate(embed.fields) if f.name == "Ticket Assumido Por"), None)
+            if index is None: embed.add_field(name="Ticket Assumido Por", value=f"<@{staff_id}>", inline=False)
+            else: embed.set_field_at(index, name="Ticket Assumido Por", value=f"<@{staff_id}>", inline=False)
+            view = TicketActionsView()
+            view.children[1].disabled = True
+            await message.edit(embed=embed, view=view)
+    await channel.send(f"## {get_emoji('info')} `Ticket Reatribuído`\n\n> O responsável por este chamado agora é <@{staff_id}>.")
+
+async def bulk_move(bot, operation, channel_id):
+    channel = bulk_channel(bot, channel_id)
+    base_id = get_config(channel.guild.id, f"category_{operation['params']['target']}_id")
+    if not base_id: raise BulkSkip("categoria de destino não configurada")
+    if channel.category_id in {c.id for c in CATEGORIES.categories(channel.guild, int(base_id))}: raise BulkSkip("já está no destino")
+    if await place_in_pool(channel.guild, int(base_id), lambda category: channel.edit(category=category)) is None: raise BulkSkip("categoria de destino não existe mais")
+
 # --- PAINEL ---
 
 class TicketPanelView(ui.View):
@@ -413,10 +725,12 @@ class TicketPanelView(ui.View):
         btn.callback = self.open_ticket_callback
         self.add_item(btn)
 
+    @traced
+    @METRICS.handler("open_ticket")
     async def open_ticket_callback(self, interaction: discord.Interaction):
         # 1. Carrega Configs
-        sid = get_config("staff_role_id")
-        cid = get_config("category_open_id")
+        sid = get_config(interaction.guild.id, "staff_role_id")
+        cid = get_config(interaction.guild.id, "category_open_id")
 
         if not sid or not cid: 
             return await interaction.response.send_message("❌ O sistema não foi configurado corretamente. Use `/config_ticket`.", ephemeral=True)
@@ -425,13 +739,33 @@ class TicketPanelView(ui.View):
         if not open_category:
             return await interaction.response.send_message("❌ A categoria de tickets configurada não existe mais.", ephemeral=True)
 
-        await interaction.response.defer(ephemeral=True)
+        async with METRICS.step("defer"): await interaction.response.defer(ephemeral=True)
 
-        if any(c.topic and str(interaction.user.id) in c.topic for c in open_category.text_channels):
+        # Checagem e envio ao scheduler sem await no meio: cliques repetidos enquanto o canal
+        # é criado caem no mesmo pedido (chave = usuário); depois disso o índice já tem o canal.
+        if OPEN_TICKETS.get(interaction.guild.id, interaction.user.id):
             return await interaction.followup.send(f"{get_emoji('cancel')} Você já possui um ticket aberto!", ephemeral=True)
+        future, position, created = TICKET_SCHEDULER.submit(interaction.guild.id, interaction.user.id, lambda: self.create_ticket(interaction, open_category, sid))
+        if not created:
+            if not position: return await interaction.followup.send(f"{get_emoji('loading')} Seu ticket já está sendo criado. Aguarde.", ephemeral=True)
+            return await interaction.followup.send(f"{get_emoji('loading')} Seu pedido já está na fila (posição **{position}**). Aguarde.", ephemeral=True)
+        if position > 1:
+            eta = TICKET_SCHEDULER.eta(interaction.guild.id, position)
+            await interaction.followup.send(f"{get_emoji('loading')} Muitos tickets sendo abertos agora. Você está na posição **{position}** da fila (~{int(eta) + 1}s).", ephemeral=True)
+
+        try:
+            async with METRICS.step("queue_wait"): chan = await future
+        except Exception as e:
+            log.error(f"Erro ao criar ticket para {interaction.user.id}: {e}")
+            return await interaction.followup.send(f"{get_emoji('cancel')} Não foi possível criar o ticket agora. Tente novamente em instantes.", ephemeral=True)
 
-        tnum = get_next_ticket_number()
-        save_next_ticket_number(tnum)
+        await interaction.followup.send(f"## {get_emoji('confirm')} `Ticket criado com sucesso!`\n\n> O seu canal foi criado com sucesso: {chan.mention}", ephemeral=True)
+
+    # Executado pelo TICKET_SCHEDULER, respeitando o limite de criação de canais do servidor.
+    @traced
+    @METRICS.handler("create_ticket")
+    async def create_ticket(self, interaction, open_category, sid):
+        tnum = await TICKET_NUMBERS.allocate(interaction.guild.id)
         
         staff = interaction.guild.get_role(int(sid))
         overwrites = {
@@ -440,10 +774,17 @@ class TicketPanelView(ui.View):
             staff: discord.PermissionOverwrite(read_messages=True, send_messages=True, manage_messages=True) if staff else discord.PermissionOverwrite(read_messages=True)
         }
         
-        chan = await interaction.guild.create_text_channel(
-            name=f"ticket-{interaction.user.name}", category=open_category, overwrites=overwrites,
-            topic=f"Ticket ID: #{tnum} | Aberto por: {interaction.user.id}"
-        )
+        async with METRICS.step("channel_create"):
+            chan = await place_in_pool(interaction.guild, open_category.id, lambda category: interaction.guild.create_text_channel(
+                name=f"ticket-{interaction.user.name}", category=category, overwrites=overwrites,
+                topic=f"Ticket ID: #{tnum} | Aberto por: {interaction.user.id}"
+            ))
+        if chan is None: raise RuntimeError("a categoria de tickets configurada não existe mais")
+        # O registro de abertura vem antes de o canal entrar no índice: nenhuma mensagem
+        # chega ao log antes dele.
+        RECORDER.start(chan.id, tnum, interaction.user.id, chan.name)
+        OPEN_TICKETS.add(interaction.guild.id, interaction.user.id, chan.id, interaction.user)
+        set_trace(ticket_id=chan.id)
 
         embed = discord.Embed(title="Obrigado por contatar o suporte!", color=discord.Color.dark_green())
         embed.description = (
@@ -463,26 +804,24 @@ class TicketPanelView(ui.View):
         embed.set_thumbnail(url=icon_url)
         embed.set_footer(text=f"© {interaction.guild.name}. All rights reserved.", icon_url=icon_url)
 
-        # TENTA ANEXAR BANNER LOCAL
-        banner_path = os.path.join(EMOJIS_DIR, BANNER_FILENAME)
-        file_to_send = None
-        if os.path.exists(banner_path):
-            file_to_send = discord.File(banner_path, filename=BANNER_FILENAME)
-            embed.set_image(url=f"attachment://{BANNER_FILENAME}")
+        file_to_send = attach_banner(embed)
 
         view = TicketActionsView()
         
-        if file_to_send:
-            await chan.send(content=interaction.user.mention, embed=embed, view=view, file=file_to_send)
-        else:
-            await chan.send(content=interaction.user.mention, embed=embed, view=view)
-        
-        await interaction.followup.send(f"## {get_emoji('confirm')} `Ticket criado com sucesso!`\n\n> O seu canal foi criado com sucesso: {chan.mention}", ephemeral=True)
+        async with METRICS.step("welcome"):
+            if file_to_send:
+                welcome = await chan.send(content=interaction.user.mention, embed=embed, view=view, file=file_to_send)
+            else:
+                welcome = await chan.send(content=interaction.user.mention, embed=embed, view=view)
+        await asyncio.to_thread(STORE.add_ticket, interaction.guild.id, chan.id, tnum, interaction.user.id, welcome.id, current_trace())
+        log.info(f"Ticket #{tnum} ({chan.name}) aberto por {interaction.user.id}")
+        return chan
 
 # --- MAIN COG ---
 class TicketSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.startup_task = self.catch_up_task = None
         self.bot.add_view(TicketPanelView())
         view = TicketActionsView()
         try:
@@ -491,47 +830,338 @@ class TicketSystem(commands.Cog):
             view.children[2].emoji = get_emoji('info')
         except: pass
         self.bot.add_view(view)
+        self.bot.add_dynamic_items(FeedbackButton)
+        for action, handler in (("close", bulk_close), ("export", bulk_export), ("reassign", bulk_reassign), ("move", bulk_move)):
+            BULK.register(action, lambda operation, channel_id, handler=handler: handler(self.bot, operation, channel_id))
+
+    async def cog_load(self):
+        self.config_version = await asyncio.to_thread(STORE.data_version)
+        self.review_cursor = await asyncio.to_thread(STORE.max_review_rowid)
+        self.config_watcher.start()
+        self.startup_task = asyncio.create_task(self.startup(time.time()), name="startup")
+        self.startup_task.add_done_callback(log_task_failure)
+        self.store_maintenance.start()
+        self.category_maintenance.start()
+
+    # Eventos ao vivo vão para STATS desde o cog_load; o backfill cobre só o que veio antes de stats_until.
+    async def startup(self, stats_until):
+        await self.bot.wait_until_ready()
+        await self.adopt_legacy_install()
+        await CATEGORIES.load(self.bot.guilds)
+        await self.build_ticket_index()
+        await self.start_close_queue()
+        # As mensagens perdidas enquanto o bot estava offline são buscadas em segundo plano.
+        self.catch_up_task = asyncio.create_task(self.catch_up_transcripts(), name="catch_up_transcripts")
+        self.catch_up_task.add_done_callback(log_task_failure)
+        await BULK.resume(owns=lambda guild_id: self.bot.get_guild(guild_id) is not None)
+        await self.load_review_index()
+        await self.load_stats(stats_until)
+
+    # Instalações de servidor único guardavam tudo sem servidor (guild_id 0): atribui ao
+    # servidor dono da categoria configurada, ou ao único servidor do bot.
+    async def adopt_legacy_install(self):
+        legacy = _CONFIG_CACHE.get(LEGACY_GUILD)
+        cid = legacy.get("category_open_id") if legacy else None
+        guild = next((g for g in self.bot.guilds if cid and g.get_channel(int(cid))), None)
+        if not guild and len(self.bot.guilds) == 1 and (self.bot.shard_count or 1) == 1: guild = self.bot.guilds[0]
+        if not guild: return
+        await asyncio.to_thread(STORE.adopt_legacy_guild, guild.id)
+        await reload_config()
+
+    async def load_review_index(self):
+        fresh = ReviewIndex()
+        await asyncio.to_thread(fresh.load, STORE.iter_review_index())
+        REVIEWS.swap(fresh)
+
+    async def load_stats(self, until):
+        fresh = StaffStats()
+        await asyncio.to_thread(fresh.backfill, STORE, until)
+        STATS.swap(fresh)
+
+    # Avaliações gravadas por outros processos (as DMs são atendidas pelo shard 0).
+    async def sync_reviews(self):
+        while rows := await asyncio.to_thread(STORE.reviews_since, self.review_cursor):
+            for rowid, review_id, guild_id, created_at, staff, tid, stars in rows:
+                if REVIEWS.get(review_id) is None:
+                    REVIEWS.add(review_id, guild_id, created_at, staff, tid, stars)
+                    STATS.add_review(guild_id, staff, created_at, stars)
+            self.review_cursor = rows[-1][0]
+
+    def stats_report(self, guild_id, days=30, staff=None): return STATS.report_lines(guild_id, days, staff)
+
+    # Avaliações do período pelo índice em memória, mais recentes primeiro; staff e ticket
+    # (nome do canal) restringem pelos índices secundários.
+    def review_lines(self, guild_id, days=30, staff=None, ticket=None, limit=15):
+        ids = REVIEWS.between(guild_id, time.time() - days * DAY)
+        if staff is not None:
+            by_staff = REVIEWS.for_staff(guild_id, staff_key(staff))
+            ids = [i for i in ids if i in by_staff]
+        if ticket:
+            by_ticket = REVIEWS.for_ticket(guild_id, ticket)
+            ids = [i for i in ids if i in by_ticket]
+        lines = []
+        for review_id in reversed(ids[-limit:]):
+            _, created_at, staff_value, tid, stars = REVIEWS.get(review_id)
+            lines.append(f"`{review_id}` · {'⭐' * stars} · {staff_value} · {tid} · <t:{int(created_at)}:d>")
+        return lines, len(ids)
+
+    # Cria e inicia uma operação em lote; retorna (operação, task) ou (None, None) se nenhum
+    # ticket passa nos filtros. ValueError traz a mensagem para quem pediu.
+    async def start_bulk(self, guild, action, created_by, idle_days=None, staff_id=None, to_id=None, target=None, on_progress=None):
+        if action not in BULK_LABELS: raise ValueError(f"Ação inválida: use {', '.join(BULK_LABELS)}.")
+        params = {"idle_days": idle_days, "staff_id": staff_id}
+        if action == "reassign":
+            if not to_id: raise ValueError("Informe o novo responsável pelos tickets.")
+            params["to"] = to_id
+        if action == "move":
+            if target not in ("open", "claimed"): raise ValueError("Informe o destino: open (abertos) ou claimed (assumidos).")
+            params["target"] = target
+        channel_ids = await select_tickets(guild, idle_days, staff_id)
+        if not channel_ids: return None, None
+        operation = await BULK.create(guild.id, action, params, channel_ids, created_by)
+        log.info(f"Lote #{operation['id']} ({action}) criado com {len(channel_ids)} tickets em {guild.name}")
+        return operation, BULK.start(operation, on_progress)
+
+    # Interrompe um lote em andamento; guild_id restringe ao servidor de quem pediu.
+    async def cancel_bulk(self, operation_id, guild_id=None):
+        operation = await asyncio.to_thread(STORE.get_bulk_operation, operation_id)
+        if not operation or (guild_id is not None and operation["guild_id"] != guild_id): return None
+        return await BULK.cancel(operation_id)
+
+    async def bulk_status_lines(self, limit=10):
+        lines = []
+        for operation in await asyncio.to_thread(STORE.get_bulk_operations, None, limit):
+            counts = await asyncio.to_thread(STORE.bulk_item_counts, operation["id"])
+            total = sum(counts.values())
+            guild = self.bot.get_guild(operation["guild_id"])
+            lines.append(
+                f"#{operation['id']} {BULK_LABELS.get(operation['action'], operation['action'])} · {guild.name if guild else operation['guild_id']} · "
+                f"{operation['status']} · {total - counts.get('pending', 0)}/{total} ({counts.get('failed', 0)} falhas, {counts.get('skipped', 0)} ignorados)"
+            )
+        return lines or ["Nenhuma operação em lote registrada."]
+
+    def memory_lines(self):
+        return [f"Tickets abertos: {len(OPEN_TICKETS.by_channel)} · donos em cache: {len(OPEN_TICKETS.members)} · esperas por anexo: {len(ATTACHMENTS)}"]
+
+    async def start_close_queue(self):
+        owns = lambda guild_id: self.bot.get_guild(guild_id) is not None
+        await DELETIONS.start(lambda channel_id: delete_closed_channel(self.bot, channel_id), owns=owns)
+        await CLOSE_QUEUE.start(lambda job: run_close_job(self.bot, job), int(os.getenv("CLOSE_WORKERS") or DEFAULT_WORKERS), owns=owns)
+
+    async def build_ticket_index(self):
+        OPEN_TICKETS.clear()
+        for guild_id, channel_id, owner_id in await asyncio.to_thread(STORE.get_open_tickets):
+            # Servidores de outros shards/processos do cluster ficam com quem os atende.
+            if self.bot.get_guild(guild_id) is None: continue
+            if self.bot.get_channel(channel_id): OPEN_TICKETS.add(guild_id, owner_id, channel_id)
+            else: await asyncio.to_thread(STORE.close_ticket, channel_id)
+
+        # Tickets criados antes do banco existir só são identificáveis pelo tópico.
+        for guild in self.bot.guilds:
+            for key in ("category_open_id", "category_claimed_id"):
+                cid = get_config(guild.id, key)
+                for category in CATEGORIES.categories(guild, int(cid)) if cid else []:
+                    for channel in category.text_channels:
+                        if channel.id in OPEN_TICKETS.by_channel: continue
+                        if parsed := parse_ticket_topic(channel.topic): OPEN_TICKETS.add(guild.id, parsed[1], channel.id)
+
+    # Recupera mensagens enviadas enquanto o bot estava offline. Alguns canais por vez; o
+    # histórico vai até a última mensagem conhecida no início, o resto chega pelo on_message.
+    async def catch_up_transcripts(self):
+        pending = iter(list(OPEN_TICKETS.by_channel))
+
+        async def worker():
+            for channel_id in pending:
+                channel = self.bot.get_channel(channel_id)
+                if not channel or not channel.last_message_id or not await asyncio.to_thread(RECORDER.is_complete, channel_id): continue
+                last_id = await asyncio.to_thread(RECORDER.last_message_id, channel_id)
+                if not last_id or channel.last_message_id <= last_id: continue
+                try:
+                    async for message in channel.history(limit=None, after=discord.Object(id=last_id), before=discord.Object(id=channel.last_message_id + 1), oldest_first=True):
+                        RECORDER.record_message(message)
+                except discord.HTTPException as e: log.warning(f"Não foi possível recuperar as mensagens do ticket {channel_id}: {e}")
+
+        await asyncio.gather(*(worker() for _ in range(CATCH_UP_CONCURRENCY)))
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.channel.id in OPEN_TICKETS.by_channel: RECORDER.record_message(message)
+        elif ATTACHMENTS.waiters: ATTACHMENTS.dispatch(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload):
+        if payload.channel_id in OPEN_TICKETS.by_channel: RECORDER.record_edit(payload.channel_id, payload.message_id, payload.data)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        if payload.channel_id in OPEN_TICKETS.by_channel: RECORDER.record_delete(payload.channel_id, payload.message_id)
+        elif payload.message_id in get_panels(payload.guild_id): await remove_panel(payload.guild_id, payload.message_id)
+
+    # Canais de ticket já são contados pelo CategoryPool na reserva; os demais entram pelos eventos.
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        parsed = parse_ticket_topic(getattr(channel, "topic", None))
+        if isinstance(channel, discord.TextChannel) and parsed:
+            OPEN_TICKETS.add(channel.guild.id, parsed[1], channel.id)
+        elif getattr(channel, "category_id", None):
+            CATEGORIES.reserve(channel.category_id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        CATEGORIES.release(getattr(channel, "category_id", None))
+        if OPEN_TICKETS.remove_channel(channel.id) is not None:
+            await asyncio.to_thread(STORE.close_ticket, channel.id)
+            RECORDER.discard(channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if getattr(before, "category_id", None) != getattr(after, "category_id", None):
+            CATEGORIES.release(before.category_id)
+            if after.category_id and not parse_ticket_topic(getattr(after, "topic", None)): CATEGORIES.reserve(after.category_id)
+        if not isinstance(after, discord.TextChannel) or before.topic == after.topic: return
+        parsed = parse_ticket_topic(after.topic)
+        if parsed and OPEN_TICKETS.by_channel.get(after.id) != (after.guild.id, parsed[1]):
+            OPEN_TICKETS.remove_channel(after.id)
+            OPEN_TICKETS.add(after.guild.id, parsed[1], after.id)
+        elif not parsed and parse_ticket_topic(before.topic):
+            OPEN_TICKETS.remove_channel(after.id)
+
+    async def cog_unload(self):
+        # A inicialização ainda pode estar rodando: para antes de fechar o que ela usa.
+        if self.startup_task:
+            self.startup_task.cancel()
+            await asyncio.gather(self.startup_task, return_exceptions=True)
+        self.bot.remove_dynamic_items(FeedbackButton)
+        self.config_watcher.cancel()
+        self.store_maintenance.cancel()
+        self.category_maintenance.cancel()
+        if self.catch_up_task: self.catch_up_task.cancel()
+        await BULK.stop()
+        await CLOSE_QUEUE.stop()
+        await DELETIONS.stop()
+        await asyncio.to_thread(TICKET_NUMBERS.release)
+        await asyncio.to_thread(RECORDER.close)
+        STORE.close()
+
+    @tasks.loop(seconds=5)
+    async def config_watcher(self):
+        version = await asyncio.to_thread(STORE.data_version)
+        if version != self.config_version:
+            self.config_version = version
+            await reload_config()
+            await self.sync_reviews()
+        if await asyncio.to_thread(ASSETS.reload_if_changed): log.info("Emojis e banner recarregados.")
+
+    @tasks.loop(hours=1)
+    async def store_maintenance(self):
+        await asyncio.to_thread(STORE.purge_feedback_drafts, time.time() - FEEDBACK_DRAFT_TTL)
+        await asyncio.to_thread(STORE.compact)
+
+    @tasks.loop(minutes=10)
+    async def category_maintenance(self):
+        CATEGORIES.resync(self.bot.guilds)
+        await CATEGORIES.cleanup(self.bot)
+
+    @category_maintenance.before_loop
+    async def before_category_maintenance(self): await self.startup_task
 
     @app_commands.command(name="setup_emojis", description="Instala os recursos visuais (emojis e banner) no servidor.")
     @app_commands.checks.has_permissions(administrator=True)
+    @traced
+    @METRICS.handler("setup_emojis")
     async def setup_emojis(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
+        async with METRICS.step("defer"): await interaction.response.defer(ephemeral=True)
         if not os.path.exists(EMOJIS_DIR): return await interaction.followup.send(f"❌ Pasta `{EMOJIS_DIR}` não encontrada.")
 
-        guild = interaction.guild
-        uploaded_count = 0
-        current_emojis = load_emojis()
-        files = os.listdir(EMOJIS_DIR)
-        
-        if not files: return await interaction.followup.send("❌ Pasta vazia.")
-        msg = await interaction.followup.send(f"⏳ Instalando emojis...")
-        
-        for filename in files:
-            if "banner" in filename.lower(): continue
-
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                emoji_name = os.path.splitext(filename)[0]
-                file_path = os.path.join(EMOJIS_DIR, filename)
-                existing_str = current_emojis.get(emoji_name)
-                exists_in_guild = False
-                if existing_str and existing_str.startswith("<"):
-                    try:
-                        if guild.get_emoji(int(existing_str.split(":")[-1].replace(">", ""))): exists_in_guild = True
-                    except: pass
-                
-                if not exists_in_guild:
-                    try:
-                        with open(file_path, "rb") as image_file: image_data = image_file.read()
-                        new_emoji = await guild.create_custom_emoji(name=emoji_name, image=image_data)
-                        current_emojis[emoji_name] = str(new_emoji)
-                        uploaded_count += 1
-                        print(f"Instalado: {emoji_name}")
-                        await asyncio.sleep(1.0)
-                    except Exception as e: print(f"Erro ao instalar {emoji_name}: {e}")
-        
-        save_emojis_to_file(current_emojis)
-        global EMOJIS; EMOJIS = current_emojis
-        await interaction.followup.send(f"✅ **{uploaded_count}** emojis instalados/atualizados!")
+        msg = await interaction.followup.send("⏳ Instalando emojis...", wait=True)
+
+        async def progress(result):
+            await msg.edit(content=f"⏳ Instalando emojis... **{result.done}/{result.total}** ({result.uploaded} enviados, {result.skipped} sem alteração)")
+
+        async with METRICS.step("install"): result = await EMOJI_INSTALLER.install(interaction.guild, progress)
+        if not result.total: return await msg.edit(content="❌ Pasta vazia.")
+        summary = f"✅ **{result.uploaded}** emojis instalados/atualizados, **{result.skipped}** já estavam em dia."
+        if result.uploaded and (panels := await refresh_panels(interaction.guild)): summary += f"\n🔄 **{panels}** painéis atualizados com os novos emojis."
+        if result.failed: summary += f"\n❌ Falharam: {', '.join(f'`{name}`' for name in result.failed)}"
+        await msg.edit(content=summary)
+
+    @app_commands.command(name="ticket_bulk", description="Fecha, exporta, reatribui ou move vários tickets de uma vez.")
+    @app_commands.describe(
+        acao="O que fazer com os tickets selecionados", dias_inativo="Só tickets sem mensagens há pelo menos N dias",
+        staff="Só tickets assumidos por este membro", para="Novo responsável (reatribuir)", destino="Categoria de destino (mover)"
+    )
+    @app_commands.choices(
+        acao=[app_commands.Choice(name=label.capitalize(), value=action) for action, label in BULK_LABELS.items()],
+        destino=[app_commands.Choice(name="Abertos", value="open"), app_commands.Choice(name="Assumidos", value="claimed")]
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    @traced
+    @METRICS.handler("ticket_bulk")
+    async def ticket_bulk(self, interaction: discord.Interaction, acao: app_commands.Choice[str], dias_inativo: app_commands.Range[int, 0, 3650] = None,
+                          staff: discord.Member = None, para: discord.Member = None, destino: app_commands.Choice[str] = None):
+        await interaction.response.defer(ephemeral=True)
+        msg = await interaction.followup.send(f"{get_emoji('loading')} Selecionando tickets...", ephemeral=True, wait=True)
+        label = BULK_LABELS[acao.value]
+
+        async def progress(result):
+            await msg.edit(content=f"{get_emoji('loading')} Lote #{result.operation['id']} ({label}): **{result.done}/{result.total}** ({result.failed} falhas)")
+
+        try:
+            operation, task = await self.start_bulk(
+                interaction.guild, acao.value, interaction.user.id, idle_days=dias_inativo, staff_id=staff.id if staff else None,
+                to_id=para.id if para else None, target=destino.value if destino else None, on_progress=progress
+            )
+        except ValueError as e: return await msg.edit(content=f"{get_emoji('cancel')} {e}")
+        if not operation: return await msg.edit(content=f"{get_emoji('info')} Nenhum ticket aberto corresponde aos filtros.")
+
+        result = await task
+        summary = f"{get_emoji('confirm')} Lote #{operation['id']} ({label}): **{result.ok}** concluídos, **{result.skipped}** ignorados, **{result.failed}** falhas."
+        # O token da interação expira em 15 minutos; lotes maiores terminam só no log.
+        try: await msg.edit(content=summary)
+        except discord.HTTPException: pass
+
+    @app_commands.command(name="ticket_bulk_cancel", description="Interrompe uma operação em lote em andamento.")
+    @app_commands.describe(lote="Número do lote (ex: 12)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def ticket_bulk_cancel(self, interaction: discord.Interaction, lote: int):
+        operation = await self.cancel_bulk(lote, interaction.guild.id)
+        if not operation:
+            return await interaction.response.send_message(f"{get_emoji('cancel')} Nenhum lote em andamento com o número #{lote}.", ephemeral=True)
+        await interaction.response.send_message(f"{get_emoji('confirm')} Lote #{lote} ({BULK_LABELS.get(operation['action'], operation['action'])}) cancelado.", ephemeral=True)
+
+    @app_commands.command(name="ticket_stats", description="Mostra as estatísticas de atendimento da equipe.")
+    @app_commands.describe(staff="Filtrar por um membro da equipe", dias="Período em dias (padrão: 30)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def ticket_stats(self, interaction: discord.Interaction, staff: discord.Member = None, dias: app_commands.Range[int, 1, 3650] = 30):
+        lines = self.stats_report(interaction.guild.id, dias, staff.id if staff else None)
+        embed = discord.Embed(title=f"Estatísticas de Atendimento ({dias} dias)", color=discord.Color.blue())
+        embed.description = "\n".join(f"> {line}" for line in lines[:15])[:4096]
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="ticket_reviews", description="Busca avaliações por staff, ticket, período ou ID.")
+    @app_commands.describe(staff="Filtrar por um membro da equipe", ticket="Nome do canal do ticket", dias="Período em dias (padrão: 30)", avaliacao="ID da avaliação (ex: #aB3dE9x)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def ticket_reviews(self, interaction: discord.Interaction, staff: discord.Member = None, ticket: str = None, dias: app_commands.Range[int, 1, 3650] = 30, avaliacao: str = None):
+        if avaliacao:
+            review_id = avaliacao if avaliacao.startswith("#") else f"#{avaliacao}"
+            entry = REVIEWS.get(review_id)
+            review = await asyncio.to_thread(STORE.get_review, review_id) if entry and entry[0] == interaction.guild.id else None
+            if not review: return await interaction.response.send_message(f"{get_emoji('cancel')} Avaliação `{review_id}` não encontrada.", ephemeral=True)
+            embed = discord.Embed(title=f"Avaliação {review_id}", color=discord.Color.blue())
+            embed.add_field(name="Nota", value=f"{str(get_emoji('star')) * review['stars']}")
+            embed.add_field(name="Staff", value=review["staff"] or "-")
+            embed.add_field(name="Ticket", value=review["tid"] or "-")
+            embed.add_field(name="Cliente", value=review["user"] or "-")
+            embed.add_field(name="Data", value=f"<t:{int(review['created_at'])}:f>")
+            embed.description = f"**Comentário:**\n```{review['comment'] or 'Sem comentário'}```"
+            if review["imgs"]: embed.set_image(url=review["imgs"][0])
+            return await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        lines, total = self.review_lines(interaction.guild.id, dias, staff.id if staff else None, ticket)
+        embed = discord.Embed(title=f"Avaliações ({dias} dias)", color=discord.Color.blue())
+        embed.description = "\n".join(f"> {line}" for line in lines)[:4096] if lines else "> Nenhuma avaliação encontrada."
+        if total > len(lines): embed.set_footer(text=f"Mostrando as {len(lines)} mais recentes de {total}.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name="config_ticket", description="Inicia o assistente de configuração do sistema de atendimento.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -557,17 +1187,13 @@ class TicketSystem(commands.Cog):
         embed.set_thumbnail(url=icon_url)
         embed.set_footer(text=f"© {interaction.guild.name}. All rights reserved.", icon_url=icon_url)
 
-        banner_path = os.path.join(EMOJIS_DIR, BANNER_FILENAME)
-        file_to_send = None
-        
-        if os.path.exists(banner_path):
-            file_to_send = discord.File(banner_path, filename=BANNER_FILENAME)
-            embed.set_image(url=f"attachment://{BANNER_FILENAME}")
+        file_to_send = attach_banner(embed)
         
         if file_to_send:
-            await interaction.channel.send(embed=embed, view=TicketPanelView(), file=file_to_send)
+            panel = await interaction.channel.send(embed=embed, view=TicketPanelView(), file=file_to_send)
         else:
-            await interaction.channel.send(embed=embed, view=TicketPanelView())
+            panel = await interaction.channel.send(embed=embed, view=TicketPanelView())
+        await add_panel(interaction.guild.id, interaction.channel.id, panel.id)
 
         await interaction.followup.send("Painel enviado!", ephemeral=True)
 
@@ -0,0 +1,98 @@
+import os
+import sys
+import asyncio
+import logging
+import argparse
+import aiohttp
+from dotenv import load_dotenv
+from colorama import init, Fore, Style
+
+# Inicia o bot em N processos (clusters), cada um com uma fatia dos shards. Todos
+# compartilham o tickets.db (SQLite em modo WAL), então contadores, configurações,
+# fechamentos pendentes e avaliações ficam consistentes entre os processos.
+
+init(autoreset=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format=f'{Fore.CYAN}[%(asctime)s]{Style.RESET_ALL} {Fore.MAGENTA}[launcher]{Style.RESET_ALL} %(message)s',
+    datefmt='%H:%M:%S'
+)
+log = logging.getLogger("ZEN_LAUNCHER")
+
+load_dotenv()
+TOKEN = os.getenv('DISCORD_TOKEN')
+BOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bot.py")
+IDENTIFY_INTERVAL = 5.0
+MAX_RESTART_DELAY = 60.0
+
+# Quantidade de shards recomendada pelo Discord e quantos IDENTIFY podem ser feitos juntos.
+async def fetch_gateway_info():
+    async with aiohttp.ClientSession() as session:
+        async with session.get("https://discord.com/api/v10/gateway/bot", headers={"Authorization": f"Bot {TOKEN}"}) as response:
+            response.raise_for_status()
+            data = await response.json()
+    return data["shards"], data["session_start_limit"]["max_concurrency"]
+
+def split_shards(shard_count, clusters):
+    clusters = max(1, min(clusters, shard_count))
+    size, extra = divmod(shard_count, clusters)
+    result, start = [], 0
+    for i in range(clusters):
+        end = start + size + (1 if i < extra else 0)
+        result.append(list(range(start, end)))
+        start = end
+    return result
+
+async def run_cluster(cluster_id, shard_ids, shard_count, start_delay, stopping):
+    env = dict(os.environ, CLUSTER_ID=str(cluster_id), SHARD_COUNT=str(shard_count), SHARD_IDS=",".join(map(str, shard_ids)))
+    await asyncio.sleep(start_delay)
+    delay = IDENTIFY_INTERVAL
+    while not stopping.is_set():
+        log.info(f"Iniciando cluster {cluster_id} (shards {shard_ids[0]}-{shard_ids[-1]} de {shard_count})")
+        process = await asyncio.create_subprocess_exec(sys.executable, BOT_FILE, env=env, stdin=asyncio.subprocess.DEVNULL)
+        started = asyncio.get_running_loop().time()
+        waiter = asyncio.create_task(process.wait())
+        stop = asyncio.create_task(stopping.wait())
+        await asyncio.wait({waiter, stop}, return_when=asyncio.FIRST_COMPLETED)
+        if stopping.is_set():
+            if process.returncode is None:
+                process.terminate()
+                try: await asyncio.wait_for(process.wait(), 15)
+                except asyncio.TimeoutError: process.kill()
+            break
+        stop.cancel()
+        # Reinicia com espera crescente se o processo cair logo após iniciar.
+        delay = IDENTIFY_INTERVAL if asyncio.get_running_loop().time() - started > MAX_RESTART_DELAY else min(delay * 2, MAX_RESTART_DELAY)
+        log.warning(f"Cluster {cluster_id} saiu com código {process.returncode}; reiniciando em {delay:.0f}s.")
+        await asyncio.sleep(delay)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Inicia o bot em vários processos com shards divididos.")
+    parser.add_argument("--clusters", type=int, default=os.cpu_count() or 1, help="quantidade de processos (padrão: núcleos da CPU)")
+    parser.add_argument("--shards", type=int, help="total de shards (padrão: recomendado pelo Discord)")
+    args = parser.parse_args()
+
+    if not TOKEN: return log.error("DISCORD_TOKEN não definido no .env.")
+    recommended, max_concurrency = await fetch_gateway_info()
+    shard_count = args.shards or recommended
+    groups = split_shards(shard_count, args.clusters)
+    log.info(f"{shard_count} shards em {len(groups)} clusters (recomendado: {recommended}, IDENTIFY simultâneos: {max_concurrency})")
+
+    # Cada processo identifica seus shards em sequência: escalona os inícios para não
+    # estourar o limite de IDENTIFY, que é global para o token.
+    stopping = asyncio.Event()
+    offsets, elapsed = [], 0.0
+    for shard_ids in groups:
+        offsets.append(elapsed)
+        elapsed += IDENTIFY_INTERVAL * len(shard_ids) / max_concurrency
+    tasks = [asyncio.create_task(run_cluster(i, ids, shard_count, offsets[i], stopping)) for i, ids in enumerate(groups)]
+    try: await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        stopping.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print(f"\n{Fore.RED}Launcher interrompido manualmente.{Style.RESET_ALL}")
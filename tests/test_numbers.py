@@ -0,0 +1,42 @@
+import asyncio
+
+from utils.numbers import NumberAllocator
+from utils.store import TicketStore
+
+
+def test_two_processes_never_share_a_number(tmp_path):
+    # Dois stores no mesmo arquivo fazem o papel de dois processos do cluster.
+    path = str(tmp_path / "tickets.db")
+    stores = [TicketStore(path), TicketStore(path)]
+    allocators = [NumberAllocator(store, "ticket", block_size=3) for store in stores]
+
+    async def scenario():
+        return await asyncio.gather(*(allocators[i % 2].allocate(7) for i in range(60)))
+
+    try:
+        numbers = asyncio.run(scenario())
+        assert len(set(numbers)) == 60
+        assert min(numbers) == 1
+    finally:
+        for store in stores: store.close()
+
+
+def test_release_returns_unused_numbers_only_if_nobody_leased_after(tmp_path):
+    path = str(tmp_path / "tickets.db")
+    first, second = TicketStore(path), TicketStore(path)
+    try:
+        allocator = NumberAllocator(first, "ticket", block_size=10)
+        assert asyncio.run(allocator.allocate(7)) == 1
+        allocator.release()
+        # Ninguém reservou depois: o próximo bloco continua do 2.
+        assert second.lease_counter_block(7, "ticket", 10) == (2, 11)
+
+        allocator = NumberAllocator(first, "ticket", block_size=10)
+        assert asyncio.run(allocator.allocate(7)) == 12
+        assert second.lease_counter_block(7, "ticket", 10) == (22, 31)
+        allocator.release()
+        # O outro processo já passou do bloco: a devolução não pode reutilizar números.
+        assert second.lease_counter_block(7, "ticket", 1) == (32, 32)
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,82 @@
+import asyncio
+
+from utils.scheduler import AdmissionScheduler
+
+
+class FakeRateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__("429")
+        self.retry_after = retry_after
+
+
+def test_duplicate_submit_reuses_the_pending_request():
+    async def scenario():
+        scheduler = AdmissionScheduler(rate=1000, burst=1)
+        calls = []
+
+        async def create():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "canal"
+
+        first, _, created = scheduler.submit(1, 42, create)
+        again, _, created_again = scheduler.submit(1, 42, create)
+        assert created and not created_again
+        assert again is first
+        assert await first == "canal"
+        assert len(calls) == 1
+
+        # Terminado o pedido, a chave é liberada e um novo clique cria outro pedido.
+        _, _, created_later = scheduler.submit(1, 42, create)
+        assert created_later
+
+    asyncio.run(scenario())
+
+
+def test_other_users_are_not_coalesced():
+    async def scenario():
+        scheduler = AdmissionScheduler(rate=1000, burst=5)
+
+        async def create(): return "canal"
+
+        results = [scheduler.submit(1, user, create) for user in (1, 2, 3)]
+        assert all(created for _, _, created in results)
+        assert [position for _, position, _ in results] == [1, 2, 3]
+        await asyncio.gather(*(future for future, _, _ in results))
+
+    asyncio.run(scenario())
+
+
+def test_rate_limited_request_is_requeued_and_retried():
+    async def scenario():
+        scheduler = AdmissionScheduler(rate=1000, burst=5)
+        attempts = []
+
+        async def create():
+            attempts.append(1)
+            if len(attempts) == 1: raise FakeRateLimited(0.05)
+            return "canal"
+
+        future, _, _ = scheduler.submit(1, 42, create)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await asyncio.wait_for(future, 2) == "canal"
+        assert len(attempts) == 2
+        assert loop.time() - started >= 0.05
+
+    asyncio.run(scenario())
+
+
+def test_other_errors_fail_the_request():
+    async def scenario():
+        scheduler = AdmissionScheduler(rate=1000, burst=5)
+
+        async def create(): raise RuntimeError("sem permissão")
+
+        future, _, _ = scheduler.submit(1, 42, create)
+        try:
+            await future
+        except RuntimeError as e: assert str(e) == "sem permissão"
+        else: raise AssertionError("o pedido deveria falhar")
+
+    asyncio.run(scenario())
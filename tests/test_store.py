@@ -0,0 +1,27 @@
+from utils.store import TicketStore
+
+
+def test_second_claim_is_refused(tmp_path):
+    path = str(tmp_path / "tickets.db")
+    first, second = TicketStore(path), TicketStore(path)
+    try:
+        first.add_ticket(1, 100, 1, 500)
+        assert first.claim_ticket(100, 10)
+        assert not second.claim_ticket(100, 11)
+        assert first.get_ticket(100)["claimed_by"] == 10
+    finally:
+        first.close()
+        second.close()
+
+
+def test_reassign_only_touches_open_tickets(tmp_path):
+    store = TicketStore(str(tmp_path / "tickets.db"))
+    try:
+        store.add_ticket(1, 100, 1, 500)
+        store.claim_ticket(100, 10)
+        assert store.reassign_ticket(100, 11)
+        assert store.get_ticket(100)["claimed_by"] == 11
+        store.close_ticket(100)
+        assert not store.reassign_ticket(100, 12)
+    finally:
+        store.close()
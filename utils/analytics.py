@@ -0,0 +1,128 @@
+import bisect
+import time
+from collections import defaultdict
+
+DAY = 86400
+# Limites dos baldes de duração (segundos), em escala geométrica de 10s até ~60 dias.
+DURATION_BUCKETS = [round(10 * 1.25 ** i) for i in range(60)]
+
+
+def staff_key(value):
+    # Avaliações guardam o staff como menção ("<@id>"); tickets guardam o ID numérico.
+    if value is None: return "Staff"
+    return f"<@{value}>" if isinstance(value, int) else str(value)
+
+
+def format_duration(seconds):
+    if seconds is None: return "-"
+    seconds = int(seconds)
+    if seconds < 60: return f"{seconds}s"
+    if seconds < 3600: return f"{seconds // 60}min"
+    if seconds < DAY: return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}"
+    return f"{seconds // DAY}d{(seconds % DAY) // 3600:02d}h"
+
+
+class _Bucket:
+    __slots__ = ("stars", "claim", "close")
+
+    def __init__(self):
+        self.stars = [0] * 6
+        self.claim = [0] * (len(DURATION_BUCKETS) + 1)
+        self.close = [0] * (len(DURATION_BUCKETS) + 1)
+
+    def merge(self, other):
+        for mine, theirs in ((self.stars, other.stars), (self.claim, other.claim), (self.close, other.close)):
+            for i, value in enumerate(theirs): mine[i] += value
+
+
+def _percentile(histogram, fraction):
+    total = sum(histogram)
+    if not total: return None
+    target, seen = fraction * total, 0
+    for i, count in enumerate(histogram):
+        seen += count
+        if seen >= target: return DURATION_BUCKETS[min(i, len(DURATION_BUCKETS) - 1)]
+    return DURATION_BUCKETS[-1]
+
+
+def _guild_days(): return defaultdict(lambda: defaultdict(_Bucket))
+
+
+class StaffStats:
+    # Agregados por servidor -> dia -> staff, atualizados a cada evento; uma consulta de
+    # N dias percorre no máximo N dias x staffs ativos daquele servidor, independente do
+    # tamanho do histórico e da quantidade de servidores.
+    def __init__(self):
+        self.guilds = defaultdict(_guild_days)
+
+    def _bucket(self, guild_id, staff, timestamp): return self.guilds[guild_id][int(timestamp // DAY)][staff_key(staff)]
+
+    def add_review(self, guild_id, staff, created_at, stars):
+        if 1 <= stars <= 5: self._bucket(guild_id, staff, created_at).stars[stars] += 1
+
+    def add_claim(self, guild_id, staff, created_at, claimed_at):
+        self._bucket(guild_id, staff, claimed_at).claim[bisect.bisect_left(DURATION_BUCKETS, claimed_at - created_at)] += 1
+
+    def add_close(self, guild_id, staff, created_at, closed_at):
+        self._bucket(guild_id, staff, closed_at).close[bisect.bisect_left(DURATION_BUCKETS, closed_at - created_at)] += 1
+
+    def merge(self, other):
+        for guild_id, days in other.guilds.items():
+            for day, staffs in days.items():
+                for staff, bucket in staffs.items(): self.guilds[guild_id][day][staff].merge(bucket)
+
+    def swap(self, fresh):
+        fresh.merge(self)
+        self.guilds = fresh.guilds
+
+    # Recalcula tudo a partir do banco: as notas são agregadas pelo próprio SQLite
+    # (GROUP BY), as durações vêm em streaming linha a linha.
+    def backfill(self, store, until):
+        for guild_id, staff, day, stars, count in store.review_star_counts(until):
+            if 1 <= stars <= 5: self.guilds[guild_id][day][staff_key(staff)].stars[stars] += count
+        for guild_id, staff, created_at, claimed_at, closed_at in store.iter_ticket_durations(until):
+            if claimed_at and claimed_at < until: self.add_claim(guild_id, staff, created_at, claimed_at)
+            if closed_at and closed_at < until: self.add_close(guild_id, staff, created_at, closed_at)
+
+    def summary(self, guild_id, days=30, staff=None, now=None):
+        now = now or time.time()
+        first_day, last_day = int((now - days * DAY) // DAY), int(now // DAY)
+        wanted = staff_key(staff) if staff is not None else None
+        totals = defaultdict(_Bucket)
+        guild_days = self.guilds.get(guild_id, {})
+        for day in range(first_day, last_day + 1):
+            for key, bucket in guild_days.get(day, {}).items():
+                if wanted is None or key == wanted: totals[key].merge(bucket)
+
+        report = {}
+        for key, bucket in totals.items():
+            count = sum(bucket.stars)
+            median = None
+            if count:
+                seen = 0
+                for stars, n in enumerate(bucket.stars):
+                    seen += n
+                    if seen * 2 >= count: median = stars; break
+            report[key] = {
+                "reviews": count,
+                "mean": sum(s * n for s, n in enumerate(bucket.stars)) / count if count else None,
+                "median": median,
+                "claimed": sum(bucket.claim),
+                "closed": sum(bucket.close),
+                "claim_p50": _percentile(bucket.claim, 0.5), "claim_p90": _percentile(bucket.claim, 0.9),
+                "close_p50": _percentile(bucket.close, 0.5), "close_p90": _percentile(bucket.close, 0.9),
+            }
+        return report
+
+    def report_lines(self, guild_id, days=30, staff=None):
+        report = self.summary(guild_id, days, staff)
+        if not report: return [f"Nenhum dado nos últimos {days} dias."]
+        lines = []
+        for key, row in sorted(report.items(), key=lambda item: (-item[1]["reviews"], -item[1]["closed"])):
+            mean = f"{row['mean']:.2f}" if row["mean"] is not None else "-"
+            lines.append(
+                f"{key}: {row['reviews']} avaliações · média {mean} · mediana {row['median'] or '-'} · "
+                f"{row['claimed']} assumidos (p50 {format_duration(row['claim_p50'])}, p90 {format_duration(row['claim_p90'])}) · "
+                f"{row['closed']} fechados (p50 {format_duration(row['close_p50'])}, p90 {format_duration(row['close_p90'])})"
+            )
+        return lines
@@ -0,0 +1,83 @@
+import io
+import json
+import logging
+import os
+
+import discord
+
+log = logging.getLogger("ZEN_BOT")
+
+FALLBACK_EMOJI = "❓"
+
+
+class _Snapshot:
+    __slots__ = ("emojis", "banner", "fingerprint")
+
+    def __init__(self, emojis, banner, fingerprint):
+        self.emojis, self.banner, self.fingerprint = emojis, banner, fingerprint
+
+
+class AssetRegistry:
+    # Emojis já convertidos em PartialEmoji e bytes do banner em memória. Tudo fica em
+    # um único snapshot trocado de uma vez no reload, então quem monta views e mensagens
+    # nunca vê um estado pela metade nem faz parsing ou leitura de disco.
+    def __init__(self, emojis_file, emojis_dir, banner_filename, name_map, defaults):
+        self.emojis_file, self.emojis_dir, self.banner_filename = emojis_file, emojis_dir, banner_filename
+        self.name_map, self.defaults = name_map, defaults
+        self.snapshot = _Snapshot({}, None, None)
+
+    # mtimes do emojis.json e da pasta (arquivos adicionados/removidos) e do banner.
+    def fingerprint(self):
+        stamps = []
+        for path in (self.emojis_file, self.emojis_dir, os.path.join(self.emojis_dir, self.banner_filename)):
+            try: stamps.append(os.stat(path).st_mtime_ns)
+            except OSError: stamps.append(None)
+        return tuple(stamps)
+
+    def load_raw(self):
+        if not os.path.exists(self.emojis_file): return {}
+        with open(self.emojis_file, "r", encoding="utf-8") as f: return json.load(f)
+
+    # Grava em arquivo temporário e troca de uma vez: um crash no meio não corrompe o JSON.
+    def save_raw(self, data):
+        tmp = f"{self.emojis_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(data, f, indent=4)
+        os.replace(tmp, self.emojis_file)
+
+    def _resolve(self, value, default):
+        if not value: return default
+        if value.startswith("<"):
+            try: return discord.PartialEmoji.from_str(value)
+            except Exception: return default
+        return value
+
+    # Bloqueante (leitura de disco): chamar via asyncio.to_thread fora da inicialização.
+    def reload(self, raw=None):
+        fingerprint = self.fingerprint()
+        try: raw = self.load_raw() if raw is None else raw
+        except (OSError, ValueError) as e:
+            log.warning(f"Não foi possível ler {self.emojis_file}: {e}")
+            raw = {}
+        emojis = {name: self._resolve(value, FALLBACK_EMOJI) for name, value in raw.items()}
+        for key, file_name in self.name_map.items():
+            emojis[key] = self._resolve(raw.get(file_name), self.defaults.get(key, FALLBACK_EMOJI))
+        banner = None
+        try:
+            with open(os.path.join(self.emojis_dir, self.banner_filename), "rb") as f: banner = f.read()
+        except OSError: pass
+        self.snapshot = _Snapshot(emojis, banner, fingerprint)
+
+    # Recarrega só se algo mudou no disco; retorna True quando houve troca.
+    def reload_if_changed(self):
+        if self.fingerprint() == self.snapshot.fingerprint: return False
+        self.reload()
+        return True
+
+    def emoji(self, key):
+        return self.snapshot.emojis.get(key) or self.defaults.get(key, FALLBACK_EMOJI)
+
+    # Um discord.File novo a cada envio (o discord.py consome o stream), sobre os mesmos bytes.
+    def banner_file(self):
+        banner = self.snapshot.banner
+        if banner is None: return None
+        return discord.File(io.BytesIO(banner), filename=self.banner_filename)
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+
+import discord
+
+from utils.logs import trace_context
+
+log = logging.getLogger("ZEN_BOT")
+
+DEFAULT_CONCURRENCY = 4
+PROGRESS_INTERVAL = 1.5
+LOG_INTERVAL = 10
+
+
+class BulkSkip(Exception):
+    # Levantada pelo handler quando o item não precisa de nada (canal apagado, já no destino...).
+    pass
+
+
+class BulkProgress:
+    __slots__ = ("operation", "total", "ok", "skipped", "failed")
+
+    def __init__(self, operation, counts):
+        self.operation = operation
+        self.total = sum(counts.values())
+        self.ok, self.skipped, self.failed = counts.get("done", 0), counts.get("skipped", 0), counts.get("failed", 0)
+
+    @property
+    def done(self): return self.ok + self.skipped + self.failed
+
+
+class BulkRunner:
+    # Operações em lote sobre tickets (fechar, exportar, reatribuir, mover). A lista de
+    # canais é gravada no banco antes de começar e cada item é marcado ao terminar, então
+    # uma operação interrompida continua só com o que faltou. Um número fixo de workers
+    # processa os itens; o ritmo das chamadas fica com os buckets de rate limit do discord.py.
+    def __init__(self, store, concurrency=DEFAULT_CONCURRENCY):
+        self.store, self.concurrency = store, max(1, concurrency)
+        self.handlers = {}
+        self.tasks = {}
+
+    # handler(operation, channel_id) é chamado uma vez por item.
+    def register(self, action, handler): self.handlers[action] = handler
+
+    async def create(self, guild_id, action, params, channel_ids, created_by):
+        if action not in self.handlers: raise ValueError(f"Ação desconhecida: {action}")
+        return await asyncio.to_thread(self.store.create_bulk_operation, guild_id, action, params, channel_ids, created_by)
+
+    def start(self, operation, on_progress=None):
+        task = self.tasks.get(operation["id"])
+        if task is None:
+            task = self.tasks[operation["id"]] = asyncio.create_task(self._run(operation, on_progress))
+            task.add_done_callback(lambda _: self.tasks.pop(operation["id"], None))
+        return task
+
+    # Retoma as operações que um reinício interrompeu (owns filtra por servidor no cluster).
+    async def resume(self, owns=None):
+        resumed = [op for op in await asyncio.to_thread(self.store.get_bulk_operations, "running") if owns is None or owns(op["guild_id"])]
+        for operation in resumed:
+            log.info(f"Retomando lote #{operation['id']} ({operation['action']}).")
+            self.start(operation)
+        return len(resumed)
+
+    # Para uma operação em andamento; os itens que faltavam ficam pendentes e ela não é
+    # retomada. Retorna a operação, ou None se ela não existe ou já terminou.
+    async def cancel(self, operation_id):
+        operation = await asyncio.to_thread(self.store.get_bulk_operation, operation_id)
+        if not operation or operation["status"] != "running": return None
+        await asyncio.to_thread(self.store.set_bulk_operation_status, operation_id, "cancelled")
+        task = self.tasks.get(operation_id)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        log.info(f"Lote #{operation_id} ({operation['action']}) cancelado.")
+        return operation
+
+    async def stop(self):
+        tasks = list(self.tasks.values())
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, operation, on_progress):
+        with trace_context(f"lote-{operation['id']}"):
+            return await self._process(operation, on_progress)
+
+    async def _process(self, operation, on_progress):
+        handler = self.handlers[operation["action"]]
+        pending = iter(await asyncio.to_thread(self.store.get_pending_bulk_items, operation["id"]))
+        progress = BulkProgress(operation, await asyncio.to_thread(self.store.bulk_item_counts, operation["id"]))
+        last_report = last_log = time.monotonic()
+
+        async def report(force=False):
+            nonlocal last_report, last_log
+            now = time.monotonic()
+            if force or now - last_log >= LOG_INTERVAL:
+                last_log = now
+                log.info(f"Lote #{operation['id']} ({operation['action']}): {progress.done}/{progress.total} ({progress.failed} falhas, {progress.skipped} ignorados)")
+            if on_progress is None or (not force and now - last_report < PROGRESS_INTERVAL): return
+            last_report = now
+            try: await on_progress(progress)
+            except discord.HTTPException: pass
+
+        # Os workers dividem o mesmo iterador: nunca há mais itens em andamento que workers.
+        async def worker():
+            for channel_id in pending:
+                try:
+                    await handler(operation, channel_id)
+                    status, error = "done", None
+                    progress.ok += 1
+                except BulkSkip as e:
+                    status, error = "skipped", str(e) or None
+                    progress.skipped += 1
+                except Exception as e:
+                    status, error = "failed", f"{type(e).__name__}: {e}"[:500]
+                    progress.failed += 1
+                    log.warning(f"Lote #{operation['id']}: falha no canal {channel_id}: {error}")
+                await asyncio.to_thread(self.store.set_bulk_item, operation["id"], channel_id, status, error)
+                await report()
+
+        await report(force=True)
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        await asyncio.to_thread(self.store.set_bulk_operation_status, operation["id"], "done")
+        await report(force=True)
+        return progress
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+import discord
+
+log = logging.getLogger("ZEN_BOT")
+
+CATEGORY_CHANNEL_LIMIT = 50
+
+
+def is_category_full_error(error):
+    return isinstance(error, discord.HTTPException) and "Maximum number of channels in category" in (error.text or "")
+
+
+class CategoryPool:
+    # Pool de categorias por categoria base (abertos/assumidos): quando a base chega ao
+    # limite de 50 canais, cria e reaproveita categorias extras. As contagens ficam em
+    # memória, então escolher a categoria não percorre os canais do servidor.
+    def __init__(self, store):
+        self.store = store
+        self.counts = defaultdict(int)
+        self.overflow = defaultdict(list)
+        self.base_of = {}
+        self.guild_of = {}
+        self.locks = defaultdict(asyncio.Lock)
+
+    async def load(self, guilds):
+        rows = await asyncio.to_thread(self.store.get_overflow_categories)
+        self.overflow.clear()
+        self.base_of.clear()
+        self.guild_of.clear()
+        for row in rows:
+            self.overflow[row["base_id"]].append(row["category_id"])
+            self.base_of[row["category_id"]] = row["base_id"]
+            self.guild_of[row["category_id"]] = row["guild_id"]
+        self.resync(guilds)
+
+    # Recontagem exata a partir do cache do discord.py; corrige qualquer desvio dos eventos.
+    def resync(self, guilds):
+        self.counts.clear()
+        for guild in guilds:
+            for category in guild.categories: self.counts[category.id] = len(category.channels)
+
+    def categories(self, guild, base_id):
+        ids = [base_id, *self.overflow.get(base_id, ())]
+        return [c for c in (guild.get_channel(i) for i in ids) if isinstance(c, discord.CategoryChannel)]
+
+    def reserve(self, category_id): self.counts[category_id] += 1
+
+    def release(self, category_id):
+        if category_id and self.counts.get(category_id, 0) > 0: self.counts[category_id] -= 1
+
+    def mark_full(self, category_id): self.counts[category_id] = CATEGORY_CHANNEL_LIMIT
+
+    def _first_free(self, guild, base_id):
+        for category in self.categories(guild, base_id):
+            if self.counts[category.id] < CATEGORY_CHANNEL_LIMIT: return category
+        return None
+
+    # Reserva uma vaga e retorna a categoria; o chamador deve chamar release() se falhar.
+    # None quando a categoria base foi apagada e não há categoria extra com vaga.
+    async def acquire(self, guild, base_id):
+        category = self._first_free(guild, base_id)
+        if category is None:
+            async with self.locks[base_id]:
+                category = self._first_free(guild, base_id) or await self._create_overflow(guild, base_id)
+        if category is not None: self.reserve(category.id)
+        return category
+
+    async def _create_overflow(self, guild, base_id):
+        base = guild.get_channel(base_id)
+        if not isinstance(base, discord.CategoryChannel): return None
+        pooled = self.categories(guild, base_id)
+        category = await guild.create_category(
+            name=f"{base.name} ({len(pooled) + 1})", overwrites=base.overwrites,
+            position=pooled[-1].position + 1, reason="Categoria de tickets cheia"
+        )
+        await asyncio.to_thread(self.store.add_overflow_category, guild.id, base_id, category.id)
+        self.overflow[base_id].append(category.id)
+        self.base_of[category.id] = base_id
+        self.guild_of[category.id] = guild.id
+        self.counts[category.id] = 0
+        log.info(f"Categoria extra criada: {category.name} ({category.id})")
+        return category
+
+    # Remove categorias extras vazias (ou já apagadas manualmente) de todos os servidores.
+    async def cleanup(self, client):
+        for base_id, ids in list(self.overflow.items()):
+            for category_id in list(ids):
+                if client.get_guild(self.guild_of.get(category_id)) is None: continue
+                category = client.get_channel(category_id)
+                if category is not None and (category.channels or self.counts.get(category_id, 0) > 0): continue
+                # Sai do pool antes do await: acquire() não entrega uma categoria sendo apagada.
+                index = ids.index(category_id)
+                ids.remove(category_id)
+                base = self.base_of.pop(category_id, None)
+                if category is not None:
+                    try: await category.delete(reason="Categoria extra de tickets vazia")
+                    except discord.HTTPException as e:
+                        log.warning(f"Não foi possível remover a categoria {category_id}: {e}")
+                        ids.insert(index, category_id)
+                        self.base_of[category_id] = base
+                        continue
+                self.guild_of.pop(category_id, None)
+                self.counts.pop(category_id, None)
+                await asyncio.to_thread(self.store.remove_overflow_category, category_id)
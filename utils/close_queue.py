@@ -0,0 +1,71 @@
+import asyncio
+import logging
+
+log = logging.getLogger("ZEN_BOT")
+
+DEFAULT_WORKERS = 2
+
+
+class CloseJobQueue:
+    # Fila persistente de fechamentos: o botão só grava o job, e um número fixo de
+    # workers executa o transcript/DM/exclusão em segundo plano.
+    def __init__(self, store):
+        self.store = store
+        self.queue = asyncio.Queue()
+        self.workers = []
+        # IDs na ordem em que entraram na fila (dict preserva a inserção): dá a posição.
+        self.queued = {}
+        self.running = set()
+        self.handler = None
+
+    @property
+    def started(self): return bool(self.workers)
+
+    # owns(guild_id) filtra os jobs pendentes: em modo cluster cada processo só retoma
+    # os fechamentos dos servidores que estão nos seus shards.
+    async def start(self, handler, workers=DEFAULT_WORKERS, owns=None):
+        if self.started: return
+        self.handler = handler
+        for job in await asyncio.to_thread(self.store.get_unfinished_close_jobs):
+            if owns is None or owns(job["guild_id"]): self._put(job)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(max(1, workers))]
+
+    async def stop(self):
+        for task in self.workers: task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def _put(self, job):
+        if job["id"] in self.queued or job["id"] in self.running: return
+        self.queued[job["id"]] = None
+        self.queue.put_nowait(job)
+
+    # Retorna (job, posição na fila, criado agora).
+    async def submit(self, channel_id, guild_id, closed_by):
+        job, created = await asyncio.to_thread(self.store.enqueue_close_job, channel_id, guild_id, closed_by)
+        self._put(job)
+        return job, self.position(job["id"]), created
+
+    def position(self, job_id):
+        if job_id in self.running: return 0
+        if job_id not in self.queued: return 0
+        for index, queued_id in enumerate(self.queued, start=1):
+            if queued_id == job_id: return index
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            self.queued.pop(job["id"], None)
+            self.running.add(job["id"])
+            try:
+                await asyncio.to_thread(self.store.set_close_job_status, job["id"], "running")
+                await self.handler(job)
+                await asyncio.to_thread(self.store.set_close_job_status, job["id"], "done")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"Falha no fechamento do canal {job['channel_id']} (job {job['id']}): {e}")
+                await asyncio.to_thread(self.store.set_close_job_status, job["id"], "failed", str(e))
+            finally:
+                self.running.discard(job["id"])
+                self.queue.task_done()
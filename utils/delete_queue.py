@@ -0,0 +1,85 @@
+import asyncio
+import heapq
+import logging
+import time
+
+log = logging.getLogger("ZEN_BOT")
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 30
+
+
+class DeletionScheduler:
+    # Exclusões de canais fechados: a linha fica no banco e um único timer dorme até a
+    # próxima exclusão, em vez de cada fechamento segurar uma task (e o canal) no sleep.
+    def __init__(self, store):
+        self.store = store
+        self.heap = []
+        self.due = {}
+        self.running = set()
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.handler = None
+
+    @property
+    def started(self): return self.task is not None
+
+    def __len__(self): return len(self.due) + len(self.running)
+
+    # owns(guild_id) segue a mesma regra da fila de fechamento no modo cluster.
+    async def start(self, handler, owns=None):
+        if self.started: return
+        self.handler = handler
+        for row in await asyncio.to_thread(self.store.get_scheduled_deletes):
+            if owns is None or owns(row["guild_id"]): self._push(row["channel_id"], row["delete_at"])
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        tasks = [self.task, *self.running] if self.task else list(self.running)
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.task = None
+        self.heap.clear()
+        self.due.clear()
+        self.running.clear()
+
+    async def schedule(self, channel_id, guild_id, delay):
+        delete_at = time.time() + delay
+        await asyncio.to_thread(self.store.schedule_delete, channel_id, guild_id, delete_at)
+        self._push(channel_id, delete_at)
+
+    def _push(self, channel_id, delete_at):
+        if self.due.get(channel_id, float("inf")) <= delete_at: return
+        self.due[channel_id] = delete_at
+        heapq.heappush(self.heap, (delete_at, channel_id))
+        self.wakeup.set()
+
+    async def _run(self):
+        while True:
+            self.wakeup.clear()
+            # Entradas substituídas por um reagendamento ficam no heap e são descartadas aqui.
+            while self.heap and self.due.get(self.heap[0][1]) != self.heap[0][0]: heapq.heappop(self.heap)
+            delay = self.heap[0][0] - time.time() if self.heap else None
+            if delay is None or delay > 0:
+                try: await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError: pass
+                continue
+            _, channel_id = heapq.heappop(self.heap)
+            del self.due[channel_id]
+            task = asyncio.create_task(self._delete(channel_id))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _delete(self, channel_id):
+        try:
+            await self.handler(channel_id)
+        except Exception as e:
+            attempts = await asyncio.to_thread(self.store.retry_delete, channel_id, time.time() + RETRY_DELAY)
+            if attempts >= MAX_ATTEMPTS:
+                log.error(f"Desistindo de apagar o canal {channel_id} após {attempts} tentativas: {e}")
+                await asyncio.to_thread(self.store.remove_scheduled_delete, channel_id)
+            else:
+                log.warning(f"Falha ao apagar o canal {channel_id} (tentativa {attempts}): {e}")
+                self._push(channel_id, time.time() + RETRY_DELAY)
+            return
+        await asyncio.to_thread(self.store.remove_scheduled_delete, channel_id)
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+
+import discord
+
+log = logging.getLogger("ZEN_BOT")
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+DEFAULT_CONCURRENCY = 4
+PROGRESS_INTERVAL = 1.5
+
+
+def scan_images(directory):
+    # Bloqueante: lê e calcula o hash de cada imagem da pasta (exceto banners).
+    images = []
+    for filename in sorted(os.listdir(directory)):
+        if "banner" in filename.lower() or not filename.lower().endswith(IMAGE_EXTENSIONS): continue
+        with open(os.path.join(directory, filename), "rb") as f: data = f.read()
+        images.append((os.path.splitext(filename)[0], data, hashlib.sha256(data).hexdigest()))
+    return images
+
+
+def _emoji_id(value):
+    try: return int(value.split(":")[-1].rstrip(">"))
+    except (AttributeError, ValueError): return None
+
+
+class InstallResult:
+    __slots__ = ("total", "uploaded", "skipped", "failed")
+
+    def __init__(self, total):
+        self.total, self.uploaded, self.skipped, self.failed = total, 0, 0, []
+
+    @property
+    def done(self): return self.uploaded + self.skipped + len(self.failed)
+
+
+class EmojiInstaller:
+    # Instala os emojis da pasta em um servidor: pula imagens cujo hash já foi enviado e
+    # ainda existe no servidor, envia o resto com concorrência limitada (o ritmo fica por
+    # conta dos buckets de rate limit do discord.py, que seguem os headers da API) e grava
+    # o progresso a cada emoji, então uma execução interrompida continua de onde parou.
+    def __init__(self, store, assets, directory, concurrency=DEFAULT_CONCURRENCY):
+        self.store, self.assets, self.directory = store, assets, directory
+        self.concurrency = concurrency
+        self._checkpoint = asyncio.Lock()
+
+    async def install(self, guild, on_progress=None):
+        images = await asyncio.to_thread(scan_images, self.directory)
+        uploads = await asyncio.to_thread(self.store.get_emoji_uploads, guild.id)
+        current = await asyncio.to_thread(self.assets.load_raw)
+        result = InstallResult(len(images))
+        last_report = 0.0
+
+        async def report(force=False):
+            nonlocal last_report
+            if on_progress is None or (not force and time.monotonic() - last_report < PROGRESS_INTERVAL): return
+            last_report = time.monotonic()
+            try: await on_progress(result)
+            except discord.HTTPException: pass
+
+        pending = []
+        for name, data, digest in images:
+            recorded = uploads.get(name)
+            if recorded:
+                existing = recorded[1]
+                unchanged = recorded[0] == digest and guild.get_emoji(_emoji_id(existing))
+            else:
+                # Sem registro de hash mas já presente (instalação antiga): adota sem reenviar.
+                existing = current.get(name) or ""
+                unchanged = existing.startswith("<") and guild.get_emoji(_emoji_id(existing))
+            if not unchanged:
+                pending.append((name, data, digest, existing))
+                continue
+            result.skipped += 1
+            if current.get(name) != existing or not recorded: await self._save(guild.id, current, name, digest, existing)
+
+        await report(force=True)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(name, data, digest, previous):
+            async with semaphore:
+                try: emoji = await self._upload(guild, name, data, previous)
+                except discord.HTTPException as e:
+                    log.warning(f"Erro ao instalar {name}: {e}")
+                    result.failed.append(name)
+                else:
+                    await self._save(guild.id, current, name, digest, str(emoji))
+                    result.uploaded += 1
+                    log.info(f"Instalado: {name}")
+            await report()
+
+        await asyncio.gather(*(worker(*item) for item in pending))
+        await asyncio.to_thread(self.assets.reload, current)
+        await report(force=True)
+        return result
+
+    async def _upload(self, guild, name, data, previous):
+        while True:
+            try: emoji = await guild.create_custom_emoji(name=name, image=data, reason="Instalação de emojis")
+            except discord.RateLimited as e:
+                # Só acontece com max_ratelimit_timeout configurado no bot; o padrão já espera sozinho.
+                await asyncio.sleep(e.retry_after)
+                continue
+            break
+        # A imagem mudou: o emoji antigo só sai depois que o novo existe.
+        old = guild.get_emoji(_emoji_id(previous)) if previous else None
+        if old and old.id != emoji.id:
+            try: await old.delete(reason="Emoji atualizado")
+            except discord.HTTPException: pass
+        return emoji
+
+    async def _save(self, guild_id, current, name, digest, emoji):
+        async with self._checkpoint:
+            current[name] = emoji
+            await asyncio.to_thread(self.assets.save_raw, dict(current))
+            await asyncio.to_thread(self.store.set_emoji_upload, guild_id, name, digest, emoji)
@@ -0,0 +1,133 @@
+import atexit
+import copy
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from colorama import Fore, Style
+
+# Identificadores carregados pelo contexto da task: todo log emitido durante uma
+# interação (e nas tasks criadas a partir dela) sai com o mesmo trace e ticket.
+TRACE_ID = contextvars.ContextVar("trace_id", default="-")
+TICKET_ID = contextvars.ContextVar("ticket_id", default=None)
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+ANSI = re.compile(r"\x1b\[[0-9;]*m")
+LEVEL_COLORS = {"DEBUG": Fore.BLUE, "INFO": Fore.WHITE, "WARNING": Fore.YELLOW, "ERROR": Fore.RED, "CRITICAL": Fore.RED}
+
+
+def trace_for(snowflake):
+    # IDs curtos e estáveis: o mesmo ID de interação sempre gera o mesmo trace.
+    return format(snowflake, "x")[-10:]
+
+
+# Troca trace/ticket da task atual. Dentro de traced() ou trace_context() a troca é
+# desfeita na saída; é assim que claim/close/avaliação adotam o trace do ticket.
+def set_trace(trace_id=None, ticket_id=None):
+    if trace_id: TRACE_ID.set(trace_id)
+    if ticket_id is not None: TICKET_ID.set(ticket_id)
+
+
+def current_trace(): return TRACE_ID.get()
+
+
+@contextmanager
+def trace_context(trace_id=None, ticket_id=None):
+    trace_token = TRACE_ID.set(trace_id or TRACE_ID.get())
+    ticket_token = TICKET_ID.set(ticket_id if ticket_id is not None else TICKET_ID.get())
+    try: yield
+    finally:
+        TICKET_ID.reset(ticket_token)
+        TRACE_ID.reset(trace_token)
+
+
+def traced(func):
+    # Decorator para callbacks de interação: o trace vem do ID da interação recebida.
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        interaction = next((a for a in args if hasattr(a, "response") and hasattr(a, "id")), None)
+        with trace_context(trace_for(interaction.id) if interaction is not None else None):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    # Roda ainda na task que emitiu o log: copia trace e ticket do contexto e resolve a
+    # mensagem antes de o registro trocar de thread. O traceback fica separado em
+    # exc_text para o modo JSON não misturá-lo com a mensagem.
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.trace_id = TRACE_ID.get()
+        record.ticket_id = TICKET_ID.get()
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info and not record.exc_text: record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class ConsoleFormatter(logging.Formatter):
+    def __init__(self, cluster_id=None):
+        super().__init__(datefmt="%H:%M:%S")
+        self.cluster = f"{Fore.MAGENTA}[c{cluster_id}]{Style.RESET_ALL} " if cluster_id is not None else ""
+
+    def format(self, record):
+        color = LEVEL_COLORS.get(record.levelname, Fore.WHITE)
+        trace = getattr(record, "trace_id", "-")
+        context = f"{Fore.BLUE}[{trace}]{Style.RESET_ALL} " if trace != "-" else ""
+        line = (
+            f"{Fore.CYAN}[{self.formatTime(record, self.datefmt)}]{Style.RESET_ALL} {self.cluster}"
+            f"{color}[{record.levelname}]{Style.RESET_ALL} {context}{record.getMessage()}"
+        )
+        if record.exc_text: line += "\n" + record.exc_text
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, cluster_id=None):
+        super().__init__()
+        self.cluster_id = cluster_id
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname, "logger": record.name,
+            "msg": ANSI.sub("", record.getMessage()),
+            "trace": getattr(record, "trace_id", "-"), "ticket": getattr(record, "ticket_id", None),
+        }
+        if self.cluster_id is not None: data["cluster"] = self.cluster_id
+        if record.exc_text: data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+def setup_logging(level=logging.INFO, json_file=None, cluster_id=None, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+    # O event loop só enfileira o registro (QueueHandler); formatação e escrita no console
+    # ou no arquivo ficam na thread do QueueListener.
+    handlers = []
+    console = logging.StreamHandler()
+    console.setFormatter(ConsoleFormatter(cluster_id))
+    handlers.append(console)
+    if json_file:
+        if os.path.dirname(json_file): os.makedirs(os.path.dirname(json_file), exist_ok=True)
+        rotating = logging.handlers.RotatingFileHandler(json_file, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        rotating.setFormatter(JsonFormatter(cluster_id))
+        handlers.append(rotating)
+
+    records = queue.SimpleQueue()
+    queue_handler = _ContextQueueHandler(records)
+    root = logging.getLogger()
+    for handler in list(root.handlers): root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import discord
+
+MEMBER_CACHE_MODES = ("full", "tickets")
+
+
+# Opções do Bot para cada modo de cache de membros (MEMBER_CACHE no .env).
+# full: padrão do discord.py, todos os membros em memória e chunking na inicialização.
+# tickets: sem intent de membros, sem chunking e sem cache; a cog guarda só os donos dos
+# tickets abertos e busca os outros pela API quando precisa. A staff é reconhecida
+# pelos cargos que já vêm no payload da interação.
+def member_cache_options(mode, intents):
+    if mode not in MEMBER_CACHE_MODES: raise ValueError(f"MEMBER_CACHE inválido: {mode!r} (use {' ou '.join(MEMBER_CACHE_MODES)})")
+    if mode == "full": return {}
+    intents.members = False
+    return {"member_cache_flags": discord.MemberCacheFlags.none(), "chunk_guilds_at_startup": False}
+
+
+# RSS atual do processo em bytes. Fora do Linux usa o pico (ru_maxrss); None se indisponível.
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError): pass
+    try: import resource
+    except ImportError: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(value): return f"{value / (1024 * 1024):.1f} MB" if value is not None else "indisponível"
+
+
+def memory_report(bot, mode, extra=()):
+    cached = sum(len(guild.members) for guild in bot.guilds)
+    total = sum(guild.member_count or 0 for guild in bot.guilds)
+    return [
+        f"RSS: {format_bytes(rss_bytes())} · modo de cache de membros: {mode}",
+        f"Servidores: {len(bot.guilds)} · membros em cache: {cached} de {total} · usuários em cache: {len(bot.users)}",
+        *extra,
+    ]
@@ -0,0 +1,178 @@
+import bisect
+import contextlib
+import contextvars
+import functools
+import logging
+import time
+from collections import defaultdict
+
+import discord
+
+log = logging.getLogger("ZEN_BOT")
+
+# Limites dos baldes de latência (segundos).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIX = "zen_"
+
+# Handler em execução na task atual: chamadas REST e etapas são atribuídas a ele.
+_HANDLER = contextvars.ContextVar("metrics_handler", default=None)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum, self.count = 0.0, 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    # Estimativa pelo limite superior do balde, como o histogram_quantile do Prometheus.
+    def quantile(self, fraction):
+        if not self.count: return None
+        target, seen = fraction * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target: return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float("inf")
+        return float("inf")
+
+
+def _labels(labels): return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs: return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _ms(seconds):
+    if seconds is None: return "-"
+    return ">60s" if seconds == float("inf") else f"{seconds * 1000:.0f}ms"
+
+
+class Metrics:
+    # Registro em memória de contadores e histogramas. Tudo roda no event loop, então
+    # não há lock: cada atualização é uma soma em um dicionário.
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.histograms = defaultdict(Histogram)
+        self.started = time.time()
+
+    def inc(self, name, value=1, **labels): self.counters[(name, _labels(labels))] += value
+
+    def observe(self, name, value, **labels): self.histograms[(name, _labels(labels))].observe(value)
+
+    # Decorator para callbacks de botões e comandos: contagem, erros e latência.
+    def handler(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                token = _HANDLER.set(name)
+                start, status = time.perf_counter(), "ok"
+                try: return await func(*args, **kwargs)
+                except BaseException:
+                    status = "error"
+                    raise
+                finally:
+                    self.inc("handler_calls_total", handler=name, status=status)
+                    self.observe("handler_seconds", time.perf_counter() - start, handler=name)
+                    _HANDLER.reset(token)
+            return wrapper
+        return decorator
+
+    # Mede uma etapa dentro do handler atual (defer, criação do canal, export, DM...).
+    @contextlib.asynccontextmanager
+    async def step(self, name):
+        start = time.perf_counter()
+        try: yield
+        finally: self.observe("step_seconds", time.perf_counter() - start, handler=_HANDLER.get() or "-", step=name)
+
+    # Envolve HTTPClient.request: toda chamada REST do bot é contada por rota e handler.
+    def instrument_http(self, http):
+        if getattr(http.request, "_instrumented", False): return
+        original = http.request
+
+        async def request(route, **kwargs):
+            start, status = time.perf_counter(), "ok"
+            try: return await original(route, **kwargs)
+            except discord.HTTPException as e:
+                status = str(e.status)
+                raise
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                labels = {"handler": _HANDLER.get() or "-", "route": f"{route.method} {route.path}"}
+                self.inc("rest_requests_total", status=status, **labels)
+                self.observe("rest_seconds", time.perf_counter() - start, **labels)
+
+        request._instrumented = True
+        http.request = request
+
+    def render_prometheus(self):
+        lines = []
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            for (metric, labels), value in self.counters.items():
+                if metric == name: lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value:g}")
+        for name in sorted({name for name, _ in self.histograms}):
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            for (metric, labels), hist in self.histograms.items():
+                if metric != name: continue
+                cumulative = 0
+                for bound, n in zip((*LATENCY_BUCKETS, "+Inf"), hist.counts):
+                    cumulative += n
+                    lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, (('le', bound),))} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {hist.sum:.6f}")
+                lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def _by_label(self, name, key):
+        for (metric, labels), hist in self.histograms.items():
+            if metric == name: yield dict(labels).get(key), dict(labels), hist
+
+    def report_lines(self):
+        lines = [f"Desde {time.strftime('%d/%m %H:%M:%S', time.localtime(self.started))}"]
+        errors = defaultdict(float)
+        for (metric, labels), value in self.counters.items():
+            if metric == "handler_calls_total" and dict(labels)["status"] == "error": errors[dict(labels)["handler"]] += value
+
+        lines.append("Handlers:")
+        for handler, _, hist in sorted(self._by_label("handler_seconds", "handler"), key=lambda item: -item[2].sum):
+            rate = errors[handler] / hist.count * 100 if hist.count else 0
+            lines.append(
+                f"  {handler}: {hist.count} chamadas · {rate:.1f}% erros · "
+                f"p50 {_ms(hist.quantile(0.5))} · p95 {_ms(hist.quantile(0.95))} · p99 {_ms(hist.quantile(0.99))}"
+            )
+            for step, labels, step_hist in sorted(self._by_label("step_seconds", "step"), key=lambda item: -item[2].sum):
+                if labels["handler"] != handler: continue
+                lines.append(f"    - {step}: {step_hist.count}x · média {_ms(step_hist.sum / step_hist.count)} · p95 {_ms(step_hist.quantile(0.95))}")
+
+        routes = sorted(self._by_label("rest_seconds", "route"), key=lambda item: -item[2].sum)
+        if routes: lines.append("Chamadas REST (por tempo total):")
+        for route, labels, hist in routes[:15]:
+            lines.append(f"  {route} [{labels['handler']}]: {hist.count}x · total {hist.sum:.2f}s · p95 {_ms(hist.quantile(0.95))}")
+        return lines
+
+    # Endpoint local em texto no formato do Prometheus (aiohttp já vem com o discord.py).
+    async def start_server(self, host, port):
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(text=self.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        log.info(f"Métricas disponíveis em http://{host}:{port}/metrics")
+        return runner
+
+
+METRICS = Metrics()
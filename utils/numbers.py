@@ -0,0 +1,33 @@
+import asyncio
+
+DEFAULT_BLOCK_SIZE = 10
+
+
+class NumberAllocator:
+    # Números sequenciais por servidor sem ir ao banco a cada ticket: uma transação reserva
+    # um bloco avançando o contador (a marca d'água) e os números do bloco saem da memória.
+    # Processos do cluster nunca recebem o mesmo número. Ao descarregar, a parte não usada
+    # é devolvida se ninguém reservou depois; após uma queda ela vira uma lacuna.
+    def __init__(self, store, name, block_size=DEFAULT_BLOCK_SIZE):
+        self.store, self.name, self.block_size = store, name, max(1, block_size)
+        self.blocks = {}
+        self.locks = {}
+
+    async def allocate(self, guild_id):
+        while True:
+            block = self.blocks.get(guild_id)
+            if block and block[0] <= block[1]:
+                block[0] += 1
+                return block[0] - 1
+            # Só uma reserva por servidor de cada vez; quem esperou usa o bloco novo.
+            async with self.locks.setdefault(guild_id, asyncio.Lock()):
+                block = self.blocks.get(guild_id)
+                if not block or block[0] > block[1]:
+                    self.blocks[guild_id] = list(await asyncio.to_thread(self.store.lease_counter_block, guild_id, self.name, self.block_size))
+
+    # Bloqueante: devolve ao banco os números reservados e não usados.
+    def release(self):
+        for guild_id, (next_number, last) in self.blocks.items():
+            if next_number <= last: self.store.release_counter_block(guild_id, self.name, last, next_number - 1)
+        self.blocks.clear()
+
@@ -0,0 +1,215 @@
+import html
+import json
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# --- FORMATO DO LOG ---
+# Um arquivo JSONL por ticket, só com appends:
+#   {"t": "o", ...}  abertura do ticket (marca que o log está completo desde o início)
+#   {"t": "m", ...}  mensagem nova
+#   {"t": "e", ...}  edição (conteúdo/embeds novos)
+#   {"t": "d", ...}  mensagem apagada
+MAX_OPEN_FILES = 256
+TAIL_READ_SIZE = 64 * 1024
+
+log = logging.getLogger("ZEN_BOT")
+
+
+def message_record(message):
+    return {
+        "t": "m", "id": message.id, "ts": message.created_at.timestamp(),
+        "a": {"id": message.author.id, "n": message.author.display_name, "av": message.author.display_avatar.url, "b": message.author.bot},
+        "c": message.content,
+        "e": [embed_record(e) for e in message.embeds],
+        "f": [{"n": a.filename, "u": a.url, "s": a.size, "ct": a.content_type} for a in message.attachments],
+    }
+
+
+def embed_record(embed):
+    return {"ti": embed.title, "d": embed.description, "f": [[f.name, f.value] for f in embed.fields]}
+
+
+class TranscriptRecorder:
+    # Os eventos do gateway só enfileiram o registro; abrir, escrever e apagar os arquivos
+    # fica em uma thread própria, como os logs (utils/logs.py). As leituras são bloqueantes
+    # (rodam em asyncio.to_thread) e esperam a fila esvaziar antes de abrir o arquivo.
+    def __init__(self, directory):
+        self.directory = directory
+        self._files = OrderedDict()
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, channel_id): return os.path.join(self.directory, f"{channel_id}.jsonl")
+
+    def _put(self, op, channel_id=None, data=None):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="transcript-writer", daemon=True)
+            self._thread.start()
+        self._queue.put((op, channel_id, data))
+
+    def _writer(self):
+        while True:
+            op, channel_id, data = self._queue.get()
+            if op == "stop": break
+            try:
+                if op == "write": self._handle(channel_id).write(data)
+                elif op == "discard": self._discard(channel_id)
+            except OSError as e: log.error(f"Erro ao gravar o log do ticket {channel_id}: {e}")
+            if op == "flush": data.set()
+            # Fila vazia: descarrega os buffers, então um arquivo nunca fica muito atrás.
+            if self._queue.empty():
+                for fp in self._files.values(): fp.flush()
+        for fp in self._files.values(): fp.close()
+        self._files.clear()
+
+    def _handle(self, channel_id):
+        fp = self._files.get(channel_id)
+        if fp is not None:
+            self._files.move_to_end(channel_id)
+            return fp
+        fp = open(self.path(channel_id), "a", encoding="utf-8")
+        self._files[channel_id] = fp
+        if len(self._files) > MAX_OPEN_FILES: self._files.popitem(last=False)[1].close()
+        return fp
+
+    def _discard(self, channel_id):
+        fp = self._files.pop(channel_id, None)
+        if fp: fp.close()
+        try: os.remove(self.path(channel_id))
+        except FileNotFoundError: pass
+
+    # Bloqueante: espera a thread gravar tudo o que foi enfileirado até aqui.
+    def flush(self):
+        if self._thread is None: return
+        done = threading.Event()
+        self._put("flush", data=done)
+        done.wait()
+
+    def append(self, channel_id, record):
+        self._put("write", channel_id, json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    def start(self, channel_id, number, owner_id, name):
+        self.append(channel_id, {"t": "o", "ts": datetime.now(timezone.utc).timestamp(), "n": number, "owner": owner_id, "name": name})
+
+    def record_message(self, message): self.append(message.channel.id, message_record(message))
+
+    def record_edit(self, channel_id, message_id, data):
+        record = {"t": "e", "id": message_id}
+        if "content" in data: record["c"] = data["content"]
+        if "embeds" in data: record["e"] = [{"ti": e.get("title"), "d": e.get("description"), "f": [[f.get("name"), f.get("value")] for f in e.get("fields", [])]} for e in data["embeds"]]
+        if "attachments" in data: record["f"] = [{"n": a.get("filename"), "u": a.get("url"), "s": a.get("size"), "ct": a.get("content_type")} for a in data["attachments"]]
+        if len(record) > 2: self.append(channel_id, record)
+
+    def record_delete(self, channel_id, message_id): self.append(channel_id, {"t": "d", "id": message_id})
+
+    # O log só serve para o transcript se começou na abertura do ticket.
+    def is_complete(self, channel_id):
+        self.flush()
+        try:
+            with open(self.path(channel_id), "r", encoding="utf-8") as f: first = f.readline()
+            return json.loads(first).get("t") == "o"
+        except (OSError, ValueError): return False
+
+    # Lê só o final do arquivo para descobrir a última mensagem gravada.
+    def last_message_id(self, channel_id):
+        self.flush()
+        try:
+            with open(self.path(channel_id), "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - TAIL_READ_SIZE))
+                lines = f.read().splitlines()
+        except OSError: return None
+        for line in reversed(lines):
+            try: record = json.loads(line)
+            except ValueError: continue
+            if record.get("t") == "m": return record["id"]
+        return None
+
+    def read(self, channel_id):
+        self.flush()
+        with open(self.path(channel_id), "r", encoding="utf-8") as f:
+            for line in f:
+                try: yield json.loads(line)
+                except ValueError: continue
+
+    # Apaga o log depois das gravações já enfileiradas para o canal.
+    def discard(self, channel_id): self._put("discard", channel_id)
+
+    # Bloqueante: grava o que falta, fecha os arquivos e encerra a thread.
+    def close(self):
+        if self._thread is None: return
+        self._put("stop")
+        self._thread.join()
+        self._thread = None
+
+
+# --- RENDERIZAÇÃO ---
+_STYLE = (
+    "body{background:#313338;color:#dbdee1;font-family:'gg sans','Helvetica Neue',Arial,sans-serif;margin:0;padding:16px}"
+    "header{border-bottom:1px solid #3f4147;margin-bottom:12px;padding-bottom:8px}"
+    ".msg{display:flex;gap:12px;padding:6px 0}.msg img.av{width:40px;height:40px;border-radius:50%}"
+    ".name{font-weight:600;color:#f2f3f5}.bot{background:#5865f2;color:#fff;border-radius:3px;font-size:10px;padding:1px 4px;margin-left:4px}"
+    ".ts{color:#949ba4;font-size:12px;margin-left:6px}.content{white-space:pre-wrap;word-wrap:break-word}"
+    ".edited{color:#949ba4;font-size:10px}.deleted{opacity:.5;text-decoration:line-through}"
+    ".embed{border-left:4px solid #5865f2;background:#2b2d31;border-radius:4px;padding:8px 12px;margin-top:4px;max-width:520px}"
+    ".att img{max-width:400px;max-height:300px;border-radius:4px;margin-top:4px}.att a{color:#00a8fc}"
+)
+
+
+def _ts(value): return datetime.fromtimestamp(value, timezone.utc).strftime("%d/%m/%Y %H:%M:%S UTC")
+
+
+def _render_message(record, edit, deleted):
+    esc = html.escape
+    author = record["a"]
+    content = edit.get("c", record.get("c")) or ""
+    embeds = edit.get("e", record.get("e")) or []
+    files = edit.get("f", record.get("f")) or []
+    parts = [
+        f'<div class="msg{" deleted" if deleted else ""}" id="m{record["id"]}"><img class="av" src="{esc(author["av"])}" alt="">'
+        f'<div><span class="name">{esc(author["n"])}</span>{"<span class=bot>BOT</span>" if author.get("b") else ""}'
+        f'<span class="ts">{_ts(record["ts"])}</span>{" <span class=edited>(editada)</span>" if edit else ""}'
+        f'<div class="content">{esc(content)}</div>'
+    ]
+    for embed in embeds:
+        parts.append('<div class="embed">')
+        if embed.get("ti"): parts.append(f'<div class="name">{esc(embed["ti"])}</div>')
+        if embed.get("d"): parts.append(f'<div class="content">{esc(embed["d"])}</div>')
+        for name, value in embed.get("f") or []:
+            parts.append(f'<div><b>{esc(name or "")}</b><div class="content">{esc(value or "")}</div></div>')
+        parts.append("</div>")
+    for att in files:
+        url, name = esc(att.get("u") or ""), esc(att.get("n") or "arquivo")
+        if (att.get("ct") or "").startswith("image/"): parts.append(f'<div class="att"><a href="{url}"><img src="{url}" alt="{name}"></a></div>')
+        else: parts.append(f'<div class="att"><a href="{url}">{name}</a> ({att.get("s") or 0} bytes)</div>')
+    parts.append("</div></div>\n")
+    return "".join(parts)
+
+
+# Duas passagens pelo log: a primeira guarda só edições/exclusões, a segunda gera o HTML
+# em blocos, então a memória não cresce com o tamanho do ticket.
+def render_transcript(recorder, channel_id, title):
+    edits, deleted, header = {}, set(), {}
+    for record in recorder.read(channel_id):
+        kind = record.get("t")
+        if kind == "e": edits.setdefault(record["id"], {}).update({k: v for k, v in record.items() if k in ("c", "e", "f")})
+        elif kind == "d": deleted.add(record["id"])
+        elif kind == "o": header = record
+
+    yield (
+        f'<!DOCTYPE html><html lang="pt-br"><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+        f'<style>{_STYLE}</style></head><body><header><h2>{html.escape(title)}</h2>'
+        f'<div class="ts">Ticket #{header.get("n", "?")} · aberto em {_ts(header["ts"]) if header.get("ts") else "?"}'
+        f' · gerado em {_ts(datetime.now(timezone.utc).timestamp())}</div></header>\n'
+    )
+    count = 0
+    for record in recorder.read(channel_id):
+        if record.get("t") != "m": continue
+        count += 1
+        yield _render_message(record, edits.get(record["id"], {}), record["id"] in deleted)
+    yield f'<footer class="ts">{count} mensagens</footer></body></html>'
@@ -0,0 +1,54 @@
+import bisect
+from collections import defaultdict
+
+
+class ReviewIndex:
+    # Índice secundário em memória das avaliações: guarda só os campos usados em
+    # buscas e estatísticas; o registro completo continua no banco. As chaves são
+    # separadas por servidor, então as buscas não crescem com o número de servidores.
+    def __init__(self):
+        self.by_id = {}
+        self.by_staff = defaultdict(set)
+        self.by_ticket = defaultdict(set)
+        self.by_date = defaultdict(list)
+
+    def __len__(self): return len(self.by_id)
+
+    def add(self, review_id, guild_id, created_at, staff, tid, stars):
+        if review_id in self.by_id: self.remove(review_id)
+        self.by_id[review_id] = (guild_id, created_at, staff, tid, stars)
+        self.by_staff[(guild_id, staff)].add(review_id)
+        self.by_ticket[(guild_id, tid)].add(review_id)
+        dates, entry = self.by_date[guild_id], (created_at, review_id)
+        if not dates or entry >= dates[-1]: dates.append(entry)
+        else: bisect.insort(dates, entry)
+
+    def remove(self, review_id):
+        guild_id, created_at, staff, tid, _ = self.by_id.pop(review_id)
+        self.by_staff[(guild_id, staff)].discard(review_id)
+        self.by_ticket[(guild_id, tid)].discard(review_id)
+        dates = self.by_date[guild_id]
+        i = bisect.bisect_left(dates, (created_at, review_id))
+        if i < len(dates) and dates[i] == (created_at, review_id): del dates[i]
+
+    def load(self, rows):
+        for row in rows: self.add(*row)
+
+    # Substitui o conteúdo por um índice recém-carregado, preservando o que foi
+    # adicionado enquanto a varredura rodava.
+    def swap(self, fresh):
+        for review_id, entry in self.by_id.items():
+            if review_id not in fresh.by_id: fresh.add(review_id, *entry)
+        self.by_id, self.by_staff, self.by_ticket, self.by_date = fresh.by_id, fresh.by_staff, fresh.by_ticket, fresh.by_date
+
+    def get(self, review_id): return self.by_id.get(review_id)
+
+    def for_staff(self, guild_id, staff): return set(self.by_staff.get((guild_id, staff), ()))
+
+    def for_ticket(self, guild_id, tid): return set(self.by_ticket.get((guild_id, tid), ()))
+
+    def between(self, guild_id, start=None, end=None):
+        dates = self.by_date.get(guild_id, [])
+        lo = 0 if start is None else bisect.bisect_left(dates, (start, ""))
+        hi = len(dates) if end is None else bisect.bisect_left(dates, (end, ""))
+        return [review_id for _, review_id in dates[lo:hi]]
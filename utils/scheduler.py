@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+log = logging.getLogger("ZEN_BOT")
+
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 5
+DEFAULT_MAX_INFLIGHT = 3
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate, self.capacity = rate, capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    # Segundos até existir uma ficha disponível (0 = pode seguir agora).
+    def delay(self):
+        self._refill()
+        if self.tokens >= 1: return 0.0
+        return max(self.updated - time.monotonic(), 0.0) + (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+    # Após um 429, esvazia o balde até o fim do retry_after informado pela API.
+    def penalize(self, retry_after):
+        self.tokens = 0.0
+        self.updated = max(self.updated, time.monotonic() + retry_after)
+
+
+class _Entry:
+    __slots__ = ("key", "factory", "future")
+
+    def __init__(self, key, factory):
+        self.key, self.factory = key, factory
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class _GuildQueue:
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.bucket = TokenBucket(scheduler.rate, scheduler.burst)
+        self.pending = deque()
+        self.by_key = {}
+        self.inflight = asyncio.Semaphore(scheduler.max_inflight)
+        self.worker = None
+
+    def position(self, entry):
+        try: return self.pending.index(entry) + 1
+        except ValueError: return 0
+
+    async def _drain(self):
+        while self.pending:
+            await self.inflight.acquire()
+            while (wait := self.bucket.delay()) > 0: await asyncio.sleep(wait)
+            if not self.pending:
+                self.inflight.release()
+                break
+            entry = self.pending.popleft()
+            self.bucket.take()
+            asyncio.create_task(self._run(entry))
+        self.worker = None
+
+    async def _run(self, entry):
+        try:
+            entry.future.set_result(await entry.factory())
+        except Exception as e:
+            retry_after = getattr(e, "retry_after", None)
+            if retry_after is not None:
+                # Rate limit que o discord.py não absorveu: volta para o início da fila.
+                log.warning(f"Rate limit na criação de tickets, aguardando {retry_after:.1f}s.")
+                self.bucket.penalize(retry_after)
+                self.pending.appendleft(entry)
+                self._wake()
+                return
+            entry.future.set_exception(e)
+        finally:
+            self.inflight.release()
+            if entry.future.done(): self.by_key.pop(entry.key, None)
+
+    def _wake(self):
+        if self.worker is None: self.worker = asyncio.create_task(self._drain())
+
+
+class AdmissionScheduler:
+    # Fila FIFO por servidor na frente de operações caras (criação de canais): um balde
+    # de fichas por servidor limita a vazão, e cliques repetidos do mesmo usuário
+    # reaproveitam o pedido que já está na fila.
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_inflight=DEFAULT_MAX_INFLIGHT):
+        self.rate, self.burst, self.max_inflight = rate, burst, max_inflight
+        self.guilds = {}
+
+    def _guild(self, guild_id):
+        queue = self.guilds.get(guild_id)
+        if queue is None: queue = self.guilds[guild_id] = _GuildQueue(self)
+        return queue
+
+    # Retorna (future, posição na fila, novo). Posição 0 significa que já está executando.
+    def submit(self, guild_id, key, factory):
+        queue = self._guild(guild_id)
+        entry = queue.by_key.get(key)
+        if entry is not None: return entry.future, queue.position(entry), False
+        entry = _Entry(key, factory)
+        queue.by_key[key] = entry
+        queue.pending.append(entry)
+        position = len(queue.pending)
+        queue._wake()
+        return entry.future, position, True
+
+    # Estimativa em segundos até a posição informada ser atendida.
+    def eta(self, guild_id, position):
+        queue = self._guild(guild_id)
+        return max(0.0, position - queue.bucket.tokens) / self.rate
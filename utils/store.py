@@ -0,0 +1,613 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- MIGRAÇÕES DE SCHEMA ---
+# Cada entrada eleva o PRAGMA user_version em 1. Nunca edite uma migração já publicada,
+# apenas adicione novas ao final da lista.
+MIGRATIONS = [
+    """
+    CREATE TABLE config (
+        key   TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    CREATE TABLE counters (
+        name  TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+    CREATE TABLE tickets (
+        channel_id INTEGER PRIMARY KEY,
+        number     INTEGER,
+        owner_id   INTEGER NOT NULL,
+        status     TEXT NOT NULL DEFAULT 'open',
+        created_at REAL NOT NULL,
+        closed_at  REAL
+    );
+    CREATE INDEX idx_tickets_owner ON tickets(owner_id, status);
+    CREATE TABLE reviews (
+        id         TEXT PRIMARY KEY,
+        user       TEXT,
+        stars      INTEGER NOT NULL,
+        comment    TEXT,
+        imgs       TEXT NOT NULL DEFAULT '[]',
+        staff      TEXT,
+        tid        TEXT,
+        date       TEXT,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX idx_reviews_staff ON reviews(staff, created_at);
+    CREATE INDEX idx_reviews_tid ON reviews(tid);
+    CREATE INDEX idx_reviews_date ON reviews(date);
+    """,
+    """
+    ALTER TABLE tickets ADD COLUMN claimed_by INTEGER;
+    ALTER TABLE tickets ADD COLUMN claimed_at REAL;
+    ALTER TABLE tickets ADD COLUMN welcome_message_id INTEGER;
+    """,
+    """
+    CREATE TABLE close_jobs (
+        id         INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel_id INTEGER NOT NULL,
+        guild_id   INTEGER NOT NULL,
+        closed_by  INTEGER NOT NULL,
+        status     TEXT NOT NULL DEFAULT 'pending',
+        error      TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX idx_close_jobs_status ON close_jobs(status, id);
+    CREATE INDEX idx_close_jobs_channel ON close_jobs(channel_id, status);
+    """,
+    # Escopo por servidor. Dados antigos ficam no guild_id 0 até adopt_legacy_guild.
+    """
+    CREATE TABLE guild_config (
+        guild_id INTEGER NOT NULL,
+        key      TEXT NOT NULL,
+        value    TEXT NOT NULL,
+        PRIMARY KEY (guild_id, key)
+    );
+    INSERT INTO guild_config (guild_id, key, value) SELECT 0, key, value FROM config;
+    DROP TABLE config;
+    CREATE TABLE guild_counters (
+        guild_id INTEGER NOT NULL,
+        name     TEXT NOT NULL,
+        value    INTEGER NOT NULL,
+        PRIMARY KEY (guild_id, name)
+    );
+    INSERT INTO guild_counters (guild_id, name, value) SELECT 0, name, value FROM counters;
+    DROP TABLE counters;
+    ALTER TABLE tickets ADD COLUMN guild_id INTEGER NOT NULL DEFAULT 0;
+    DROP INDEX idx_tickets_owner;
+    CREATE INDEX idx_tickets_owner ON tickets(guild_id, owner_id, status);
+    ALTER TABLE reviews ADD COLUMN guild_id INTEGER NOT NULL DEFAULT 0;
+    DROP INDEX idx_reviews_staff;
+    CREATE INDEX idx_reviews_staff ON reviews(guild_id, staff, created_at);
+    CREATE TABLE panels (
+        message_id INTEGER PRIMARY KEY,
+        guild_id   INTEGER NOT NULL,
+        channel_id INTEGER NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX idx_panels_guild ON panels(guild_id);
+    """,
+    """
+    CREATE TABLE overflow_categories (
+        category_id INTEGER PRIMARY KEY,
+        guild_id    INTEGER NOT NULL,
+        base_id     INTEGER NOT NULL,
+        created_at  REAL NOT NULL
+    );
+    CREATE INDEX idx_overflow_base ON overflow_categories(base_id);
+    """,
+    """
+    CREATE TABLE emoji_uploads (
+        guild_id   INTEGER NOT NULL,
+        name       TEXT NOT NULL,
+        sha256     TEXT NOT NULL,
+        emoji      TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (guild_id, name)
+    );
+    """,
+    """
+    CREATE TABLE feedback_drafts (
+        id         INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id   INTEGER NOT NULL,
+        user_id    INTEGER NOT NULL,
+        ticket_id  TEXT NOT NULL,
+        handled_by TEXT,
+        stars      INTEGER NOT NULL DEFAULT 0,
+        comment    TEXT,
+        imgs       TEXT NOT NULL DEFAULT '[]',
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX idx_feedback_drafts_updated ON feedback_drafts(updated_at);
+    """,
+    """
+    ALTER TABLE tickets ADD COLUMN trace_id TEXT;
+    ALTER TABLE feedback_drafts ADD COLUMN channel_id INTEGER;
+    ALTER TABLE feedback_drafts ADD COLUMN trace_id TEXT;
+    """,
+    """
+    CREATE TABLE scheduled_deletes (
+        channel_id INTEGER PRIMARY KEY,
+        guild_id   INTEGER NOT NULL,
+        delete_at  REAL NOT NULL,
+        attempts   INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX idx_scheduled_deletes_at ON scheduled_deletes(delete_at);
+    """,
+    """
+    CREATE TABLE bulk_operations (
+        id         INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id   INTEGER NOT NULL,
+        action     TEXT NOT NULL,
+        params     TEXT NOT NULL DEFAULT '{}',
+        status     TEXT NOT NULL DEFAULT 'running',
+        created_by INTEGER,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE bulk_items (
+        operation_id INTEGER NOT NULL,
+        channel_id   INTEGER NOT NULL,
+        status       TEXT NOT NULL DEFAULT 'pending',
+        error        TEXT,
+        PRIMARY KEY (operation_id, channel_id)
+    );
+    """,
+]
+
+LEGACY_GUILD = 0
+
+
+class TicketStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self._apply_migrations()
+
+    def _apply_migrations(self):
+        with self.transaction() as cur:
+            version = cur.execute("PRAGMA user_version").fetchone()[0]
+            for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in script.split(";"):
+                    if statement.strip(): cur.execute(statement)
+                cur.execute(f"PRAGMA user_version = {number}")
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+            else:
+                cur.execute("COMMIT")
+            finally:
+                cur.close()
+
+    def close(self):
+        with self._lock: self.conn.close()
+
+    # Compactação periódica: devolve o WAL ao tamanho mínimo e atualiza as estatísticas dos índices.
+    def compact(self):
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.execute("PRAGMA optimize")
+
+    # Muda sempre que outra conexão (outro processo ou edição manual) grava no banco.
+    def data_version(self):
+        with self._lock: return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # --- MIGRAÇÃO DOS ARQUIVOS ANTIGOS ---
+    def import_legacy(self, config_file, count_file, reviews_file):
+        if os.path.exists(config_file):
+            with open(config_file, "r") as f:
+                try: data = json.load(f)
+                except ValueError: data = {}
+            self.set_config(LEGACY_GUILD, data)
+            os.replace(config_file, config_file + ".migrated")
+
+        if os.path.exists(count_file):
+            with open(count_file, "r") as f:
+                try: value = int(f.read())
+                except ValueError: value = 0
+            if value > self.get_counter(LEGACY_GUILD, "ticket"): self.set_counter(LEGACY_GUILD, "ticket", value)
+            os.replace(count_file, count_file + ".migrated")
+
+        if os.path.exists(reviews_file):
+            with open(reviews_file, "r", encoding="utf-8") as f:
+                try: reviews = json.load(f)
+                except ValueError: reviews = {}
+            with self.transaction() as cur:
+                for review_id, data in reviews.items():
+                    self._insert_review(cur, review_id, data)
+            os.replace(reviews_file, reviews_file + ".migrated")
+
+    # Move os dados da instalação de servidor único (guild_id 0) para o servidor real.
+    def adopt_legacy_guild(self, guild_id):
+        with self.transaction() as cur:
+            cur.execute("INSERT OR IGNORE INTO guild_config (guild_id, key, value) SELECT ?, key, value FROM guild_config WHERE guild_id = 0", (guild_id,))
+            cur.execute("INSERT OR IGNORE INTO guild_counters (guild_id, name, value) SELECT ?, name, value FROM guild_counters WHERE guild_id = 0", (guild_id,))
+            for table in ("guild_config", "guild_counters"): cur.execute(f"DELETE FROM {table} WHERE guild_id = 0")
+            for table in ("tickets", "reviews"): cur.execute(f"UPDATE {table} SET guild_id = ? WHERE guild_id = 0", (guild_id,))
+
+    # --- CONFIGURAÇÃO ---
+    def get_all_configs(self):
+        configs = {}
+        with self._lock:
+            rows = self.conn.execute("SELECT guild_id, key, value FROM guild_config").fetchall()
+        for row in rows: configs.setdefault(row["guild_id"], {})[row["key"]] = json.loads(row["value"])
+        return configs
+
+    def set_config(self, guild_id, data):
+        with self.transaction() as cur:
+            cur.executemany(
+                "INSERT INTO guild_config (guild_id, key, value) VALUES (?, ?, ?) ON CONFLICT(guild_id, key) DO UPDATE SET value = excluded.value",
+                [(guild_id, key, json.dumps(value)) for key, value in data.items()]
+            )
+
+    # --- CONTADORES ---
+    def get_counter(self, guild_id, name, default=0):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM guild_counters WHERE guild_id = ? AND name = ?", (guild_id, name)).fetchone()
+        return row["value"] if row else default
+
+    def set_counter(self, guild_id, name, value):
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT INTO guild_counters (guild_id, name, value) VALUES (?, ?, ?) ON CONFLICT(guild_id, name) DO UPDATE SET value = excluded.value",
+                (guild_id, name, value)
+            )
+
+    # Reserva atômica dos próximos size números; retorna (primeiro, último) do bloco.
+    # Processos diferentes (cluster) nunca recebem números repetidos.
+    def lease_counter_block(self, guild_id, name, size):
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT INTO guild_counters (guild_id, name, value) VALUES (?, ?, ?) ON CONFLICT(guild_id, name) DO UPDATE SET value = value + excluded.value",
+                (guild_id, name, size)
+            )
+            last = cur.execute("SELECT value FROM guild_counters WHERE guild_id = ? AND name = ?", (guild_id, name)).fetchone()["value"]
+        return last - size + 1, last
+
+    # Recua o contador para value só se ele ainda estiver no fim do bloco (ninguém reservou depois).
+    def release_counter_block(self, guild_id, name, last, value):
+        with self.transaction() as cur:
+            cur.execute("UPDATE guild_counters SET value = ? WHERE guild_id = ? AND name = ? AND value = ?", (value, guild_id, name, last))
+            return cur.rowcount == 1
+
+    # --- PAINÉIS ---
+    def add_panel(self, guild_id, channel_id, message_id):
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO panels (message_id, guild_id, channel_id, created_at) VALUES (?, ?, ?, ?)",
+                (message_id, guild_id, channel_id, time.time())
+            )
+
+    def remove_panel(self, message_id):
+        with self.transaction() as cur: cur.execute("DELETE FROM panels WHERE message_id = ?", (message_id,))
+
+    # {guild_id: {message_id: channel_id}}, carregado inteiro para o cache da cog.
+    def get_all_panels(self):
+        panels = {}
+        with self._lock:
+            rows = self.conn.execute("SELECT guild_id, channel_id, message_id FROM panels ORDER BY created_at").fetchall()
+        for row in rows: panels.setdefault(row["guild_id"], {})[row["message_id"]] = row["channel_id"]
+        return panels
+
+    # --- CATEGORIAS EXTRAS ---
+    def add_overflow_category(self, guild_id, base_id, category_id):
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO overflow_categories (category_id, guild_id, base_id, created_at) VALUES (?, ?, ?, ?)",
+                (category_id, guild_id, base_id, time.time())
+            )
+
+    def remove_overflow_category(self, category_id):
+        with self.transaction() as cur: cur.execute("DELETE FROM overflow_categories WHERE category_id = ?", (category_id,))
+
+    def get_overflow_categories(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM overflow_categories ORDER BY created_at").fetchall()
+        return [dict(row) for row in rows]
+
+    # --- EMOJIS ---
+    # Retorna {nome: (sha256, emoji)} do que já foi enviado a este servidor.
+    def get_emoji_uploads(self, guild_id):
+        with self._lock:
+            rows = self.conn.execute("SELECT name, sha256, emoji FROM emoji_uploads WHERE guild_id = ?", (guild_id,)).fetchall()
+        return {row["name"]: (row["sha256"], row["emoji"]) for row in rows}
+
+    def set_emoji_upload(self, guild_id, name, sha256, emoji):
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO emoji_uploads (guild_id, name, sha256, emoji, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, name, sha256, emoji, time.time())
+            )
+
+    # --- TICKETS ---
+    # trace_id: trace da interação que abriu o ticket, reaproveitado nos logs de assumir, fechar e avaliar.
+    def add_ticket(self, guild_id, channel_id, number, owner_id, welcome_message_id=None, trace_id=None):
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO tickets (channel_id, guild_id, number, owner_id, status, created_at, welcome_message_id, trace_id) VALUES (?, ?, ?, ?, 'open', ?, ?, ?)",
+                (channel_id, guild_id, number, owner_id, time.time(), welcome_message_id, trace_id)
+            )
+
+    def get_ticket(self, channel_id):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM tickets WHERE channel_id = ?", (channel_id,)).fetchone()
+        return dict(row) if row else None
+
+    # Retorna o horário do claim, ou None se o ticket já tinha sido assumido (checagem e gravação atômicas).
+    def claim_ticket(self, channel_id, staff_id):
+        now = time.time()
+        with self.transaction() as cur:
+            cur.execute(
+                "UPDATE tickets SET claimed_by = ?, claimed_at = ? WHERE channel_id = ? AND claimed_by IS NULL",
+                (staff_id, now, channel_id)
+            )
+            return now if cur.rowcount == 1 else None
+
+    def get_open_tickets(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT guild_id, channel_id, owner_id FROM tickets WHERE status = 'open'").fetchall()
+        return [(row["guild_id"], row["channel_id"], row["owner_id"]) for row in rows]
+
+    def get_open_tickets_for(self, guild_id):
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM tickets WHERE guild_id = ? AND status = 'open' ORDER BY created_at", (guild_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    # Troca o responsável de um ticket aberto (claim feito por outra pessoa ou ainda sem claim).
+    def reassign_ticket(self, channel_id, staff_id):
+        with self.transaction() as cur:
+            cur.execute(
+                "UPDATE tickets SET claimed_by = ?, claimed_at = COALESCE(claimed_at, ?) WHERE channel_id = ? AND status = 'open'",
+                (staff_id, time.time(), channel_id)
+            )
+            return cur.rowcount == 1
+
+    def close_ticket(self, channel_id):
+        now = time.time()
+        with self.transaction() as cur:
+            cur.execute("UPDATE tickets SET status = 'closed', closed_at = ? WHERE channel_id = ? AND status = 'open'", (now, channel_id))
+            return now if cur.rowcount == 1 else None
+
+    def iter_ticket_durations(self, until, batch_size=5000):
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT channel_id, guild_id, claimed_by, created_at, claimed_at, closed_at FROM tickets "
+                    "WHERE channel_id > ? AND created_at < ? ORDER BY channel_id LIMIT ?",
+                    (last_id, until, batch_size)
+                ).fetchall()
+            if not rows: return
+            for row in rows: yield row["guild_id"], row["claimed_by"], row["created_at"], row["claimed_at"], row["closed_at"]
+            last_id = rows[-1]["channel_id"]
+
+    # --- FILA DE FECHAMENTO ---
+    # Retorna (job, criado). Se o canal já tem um job não finalizado, devolve o existente.
+    def enqueue_close_job(self, channel_id, guild_id, closed_by):
+        with self.transaction() as cur:
+            row = cur.execute(
+                "SELECT * FROM close_jobs WHERE channel_id = ? AND status IN ('pending', 'running')", (channel_id,)
+            ).fetchone()
+            if row: return dict(row), False
+            now = time.time()
+            cur.execute(
+                "INSERT INTO close_jobs (channel_id, guild_id, closed_by, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (channel_id, guild_id, closed_by, now, now)
+            )
+            row = cur.execute("SELECT * FROM close_jobs WHERE id = ?", (cur.lastrowid,)).fetchone()
+            return dict(row), True
+
+    # Jobs interrompidos por um reinício ficam como 'running' e são retomados junto com os pendentes.
+    def get_unfinished_close_jobs(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM close_jobs WHERE status IN ('pending', 'running') ORDER BY id").fetchall()
+        return [dict(row) for row in rows]
+
+    def set_close_job_status(self, job_id, status, error=None):
+        with self.transaction() as cur:
+            cur.execute("UPDATE close_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?", (status, error, time.time(), job_id))
+
+    # --- EXCLUSÕES AGENDADAS ---
+    # Canais fechados aguardando exclusão; sobrevivem a reinícios como os jobs de fechamento.
+    def schedule_delete(self, channel_id, guild_id, delete_at):
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT INTO scheduled_deletes (channel_id, guild_id, delete_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET delete_at = MIN(delete_at, excluded.delete_at)",
+                (channel_id, guild_id, delete_at)
+            )
+
+    def get_scheduled_deletes(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM scheduled_deletes ORDER BY delete_at").fetchall()
+        return [dict(row) for row in rows]
+
+    # Nova tentativa mais tarde; retorna o número de tentativas já feitas.
+    def retry_delete(self, channel_id, delete_at):
+        with self.transaction() as cur:
+            cur.execute("UPDATE scheduled_deletes SET delete_at = ?, attempts = attempts + 1 WHERE channel_id = ?", (delete_at, channel_id))
+            row = cur.execute("SELECT attempts FROM scheduled_deletes WHERE channel_id = ?", (channel_id,)).fetchone()
+        return row["attempts"] if row else 0
+
+    def remove_scheduled_delete(self, channel_id):
+        with self.transaction() as cur:
+            cur.execute("DELETE FROM scheduled_deletes WHERE channel_id = ?", (channel_id,))
+
+    # --- OPERAÇÕES EM LOTE ---
+    # A lista de canais é gravada junto com a operação; cada item é marcado ao terminar.
+    def create_bulk_operation(self, guild_id, action, params, channel_ids, created_by):
+        now = time.time()
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT INTO bulk_operations (guild_id, action, params, created_by, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (guild_id, action, json.dumps(params), created_by, now, now)
+            )
+            operation_id = cur.lastrowid
+            cur.executemany("INSERT INTO bulk_items (operation_id, channel_id) VALUES (?, ?)", [(operation_id, c) for c in channel_ids])
+            row = cur.execute("SELECT * FROM bulk_operations WHERE id = ?", (operation_id,)).fetchone()
+        return self._operation(row)
+
+    def _operation(self, row):
+        if not row: return None
+        data = dict(row)
+        data["params"] = json.loads(data["params"])
+        return data
+
+    def get_bulk_operation(self, operation_id):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM bulk_operations WHERE id = ?", (operation_id,)).fetchone()
+        return self._operation(row)
+
+    def get_bulk_operations(self, status=None, limit=20):
+        with self._lock:
+            if status: rows = self.conn.execute("SELECT * FROM bulk_operations WHERE status = ? ORDER BY id", (status,)).fetchall()
+            else: rows = self.conn.execute("SELECT * FROM bulk_operations ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self._operation(row) for row in rows]
+
+    def get_pending_bulk_items(self, operation_id):
+        with self._lock:
+            rows = self.conn.execute("SELECT channel_id FROM bulk_items WHERE operation_id = ? AND status = 'pending' ORDER BY channel_id", (operation_id,)).fetchall()
+        return [row["channel_id"] for row in rows]
+
+    def bulk_item_counts(self, operation_id):
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM bulk_items WHERE operation_id = ? GROUP BY status", (operation_id,)).fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def set_bulk_item(self, operation_id, channel_id, status, error=None):
+        with self.transaction() as cur:
+            cur.execute("UPDATE bulk_items SET status = ?, error = ? WHERE operation_id = ? AND channel_id = ?", (status, error, operation_id, channel_id))
+            cur.execute("UPDATE bulk_operations SET updated_at = ? WHERE id = ?", (time.time(), operation_id))
+
+    def set_bulk_operation_status(self, operation_id, status):
+        with self.transaction() as cur:
+            cur.execute("UPDATE bulk_operations SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), operation_id))
+
+    # --- RASCUNHOS DE AVALIAÇÃO ---
+    # Estado da avaliação em andamento (nota, comentário, imagens), lido pelos botões da DM.
+    def create_feedback_draft(self, guild_id, user_id, ticket_id, handled_by, channel_id=None, trace_id=None):
+        now = time.time()
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT INTO feedback_drafts (guild_id, user_id, ticket_id, handled_by, created_at, updated_at, channel_id, trace_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (guild_id, user_id, ticket_id, handled_by, now, now, channel_id, trace_id)
+            )
+            row = cur.execute("SELECT * FROM feedback_drafts WHERE id = ?", (cur.lastrowid,)).fetchone()
+        return self._draft(row)
+
+    def _draft(self, row):
+        if not row: return None
+        data = dict(row)
+        data["imgs"] = json.loads(data["imgs"])
+        return data
+
+    def get_feedback_draft(self, draft_id):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM feedback_drafts WHERE id = ?", (draft_id,)).fetchone()
+        return self._draft(row)
+
+    # Atualiza nota/comentário e acrescenta imagens; retorna o rascunho atualizado (ou None).
+    def update_feedback_draft(self, draft_id, stars=None, comment=None, new_imgs=()):
+        with self.transaction() as cur:
+            row = cur.execute("SELECT * FROM feedback_drafts WHERE id = ?", (draft_id,)).fetchone()
+            if not row: return None
+            draft = self._draft(row)
+            if stars is not None: draft["stars"] = stars
+            if comment is not None: draft["comment"] = comment
+            draft["imgs"].extend(new_imgs)
+            draft["updated_at"] = time.time()
+            cur.execute(
+                "UPDATE feedback_drafts SET stars = ?, comment = ?, imgs = ?, updated_at = ? WHERE id = ?",
+                (draft["stars"], draft["comment"], json.dumps(draft["imgs"]), draft["updated_at"], draft_id)
+            )
+        return draft
+
+    # Remove e retorna o rascunho; só uma chamada concorrente recebe o registro (evita avaliação dupla).
+    def pop_feedback_draft(self, draft_id):
+        with self.transaction() as cur:
+            row = cur.execute("SELECT * FROM feedback_drafts WHERE id = ?", (draft_id,)).fetchone()
+            if row: cur.execute("DELETE FROM feedback_drafts WHERE id = ?", (draft_id,))
+        return self._draft(row)
+
+    def purge_feedback_drafts(self, before):
+        with self.transaction() as cur:
+            cur.execute("DELETE FROM feedback_drafts WHERE updated_at < ?", (before,))
+            return cur.rowcount
+
+    # --- AVALIAÇÕES ---
+    def _insert_review(self, cur, review_id, data):
+        try: created_at = datetime.fromisoformat(data["date"]).timestamp()
+        except (KeyError, TypeError, ValueError): created_at = time.time()
+        cur.execute(
+            "INSERT OR REPLACE INTO reviews (id, guild_id, user, stars, comment, imgs, staff, tid, date, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (review_id, data.get("guild_id", LEGACY_GUILD), data.get("user"), int(data.get("stars", 0)), data.get("comment"), json.dumps(data.get("imgs", [])),
+             data.get("staff"), data.get("tid"), data.get("date"), created_at)
+        )
+        return created_at
+
+    # Retorna o created_at gravado, usado pelo índice em memória.
+    def add_review(self, review_id, data):
+        with self.transaction() as cur: return self._insert_review(cur, review_id, data)
+
+    def review_star_counts(self, until):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT guild_id, staff, CAST(created_at / 86400 AS INTEGER) AS day, stars, COUNT(*) AS n FROM reviews "
+                "WHERE created_at < ? GROUP BY guild_id, staff, day, stars",
+                (until,)
+            ).fetchall()
+        return [(row["guild_id"], row["staff"], row["day"], row["stars"], row["n"]) for row in rows]
+
+    # Varredura em blocos por rowid: não segura o lock nem carrega a tabela inteira de uma vez.
+    def iter_review_index(self, batch_size=5000):
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT rowid, id, guild_id, created_at, staff, tid, stars FROM reviews WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows: return
+            for row in rows: yield row["id"], row["guild_id"], row["created_at"], row["staff"], row["tid"], row["stars"]
+            last_rowid = rows[-1]["rowid"]
+
+    def max_review_rowid(self):
+        with self._lock: return self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM reviews").fetchone()[0]
+
+    # Avaliações gravadas depois do rowid informado (por exemplo, por outro processo do cluster).
+    def reviews_since(self, rowid, limit=1000):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT rowid, id, guild_id, created_at, staff, tid, stars FROM reviews WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (rowid, limit)
+            ).fetchall()
+        return [(row["rowid"], row["id"], row["guild_id"], row["created_at"], row["staff"], row["tid"], row["stars"]) for row in rows]
+
+    def get_review(self, review_id):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM reviews WHERE id = ?", (review_id,)).fetchone()
+        if not row: return None
+        data = dict(row)
+        data["imgs"] = json.loads(data["imgs"])
+        return data
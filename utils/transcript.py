@@ -0,0 +1,143 @@
+import gzip
+import io
+import os
+import tempfile
+import threading
+import zipfile
+
+import discord
+
+# Até este tamanho o transcript fica em memória; acima disso vai para um arquivo temporário.
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+ENCODE_CHUNK_CHARS = 256 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+COMPRESSION_MODES = ("none", "gzip", "zip", "auto")
+
+
+class _BufferReader(io.RawIOBase):
+    # Leitor com posição própria sobre um buffer compartilhado: um memoryview (em memória)
+    # ou o arquivo temporário do spool, lido com seek + readinto sob o lock do spool (os.pread
+    # não existe no Windows). Cada upload recebe o seu, sem cópias.
+    def __init__(self, source, size, lock=None):
+        self._source, self._size, self._pos, self._lock = source, size, 0, lock
+
+    def readable(self): return True
+
+    def seekable(self): return True
+
+    def tell(self): return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR: offset += self._pos
+        elif whence == io.SEEK_END: offset += self._size
+        self._pos = max(0, min(offset, self._size))
+        return self._pos
+
+    def readinto(self, b):
+        n = min(len(b), self._size - self._pos)
+        if n <= 0: return 0
+        if isinstance(self._source, memoryview):
+            b[:n] = self._source[self._pos:self._pos + n]
+        else:
+            with self._lock:
+                self._source.seek(self._pos)
+                n = self._source.readinto(memoryview(b)[:n]) or 0
+        self._pos += n
+        return n
+
+
+class _Spool:
+    def __init__(self, max_memory):
+        self.max_memory = max_memory
+        self.fp = io.BytesIO()
+        self.in_memory = True
+        self._view = None
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        self.fp.write(data)
+        if self.in_memory and self.fp.tell() > self.max_memory:
+            disk = tempfile.TemporaryFile()
+            disk.write(self.fp.getbuffer())
+            self.fp, self.in_memory = disk, False
+
+    def tell(self): return self.fp.tell()
+
+    def flush(self): self.fp.flush()
+
+    def size(self):
+        return self.fp.getbuffer().nbytes if self.in_memory else os.fstat(self.fp.fileno()).st_size
+
+    def reader(self):
+        self.fp.flush()
+        if not self.in_memory: return _BufferReader(self.fp, self.size(), self._lock)
+        if self._view is None: self._view = self.fp.getbuffer()
+        return _BufferReader(self._view, self._view.nbytes)
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        self.fp.close()
+
+
+class Transcript:
+    def __init__(self, filename, max_memory=SPOOL_MAX_SIZE):
+        self.filename = filename
+        self.max_memory = max_memory
+        self._spool = _Spool(max_memory)
+
+    @property
+    def size(self): return self._spool.size()
+
+    # Codifica em blocos direto no spool, sem manter uma cópia inteira em bytes.
+    def write(self, text):
+        for i in range(0, len(text), ENCODE_CHUNK_CHARS):
+            self._spool.write(text[i:i + ENCODE_CHUNK_CHARS].encode("utf-8"))
+
+    def writelines(self, chunks):
+        for chunk in chunks: self.write(chunk)
+
+    # mode: "none", "gzip", "zip" ou "auto" (compacta em zip só se passar de limit bytes).
+    def finish(self, mode="auto", limit=None):
+        if mode == "auto": mode = "zip" if limit and self.size > limit else "none"
+        if mode == "gzip": self._repack(".gz", lambda out, name: gzip.GzipFile(filename=name, mode="wb", fileobj=out))
+        elif mode == "zip": self._repack(".zip", self._open_zip_member)
+
+    @staticmethod
+    def _open_zip_member(out, name):
+        archive = zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED)
+        member = archive.open(name, "w", force_zip64=True)
+        original_close = member.close
+        def close():
+            original_close()
+            archive.close()
+        member.close = close
+        return member
+
+    def _repack(self, suffix, opener):
+        packed = _Spool(self.max_memory)
+        source = self._spool.reader()
+        sink = opener(packed, self.filename)
+        while chunk := source.read(COPY_CHUNK_SIZE): sink.write(chunk)
+        sink.close()
+        self._spool.close()
+        self._spool = packed
+        self.filename += suffix
+
+    # Cada chamada devolve um discord.File independente sobre o mesmo buffer.
+    def file(self):
+        return discord.File(self._spool.reader(), filename=self.filename)
+
+    # Bloqueante: copia o conteúdo final para um arquivo em disco.
+    def save(self, path):
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        source = self._spool.reader()
+        with open(path, "wb") as f:
+            while chunk := source.read(COPY_CHUNK_SIZE): f.write(chunk)
+
+    def close(self): self._spool.close()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc): self.close()
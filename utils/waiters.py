@@ -0,0 +1,59 @@
+import asyncio
+
+MAX_QUEUED_BATCHES = 5
+
+
+def pick_images(attachments, limit, max_size):
+    # Retorna (urls aceitas, quantidade recusada) respeitando o limite de quantidade e tamanho.
+    accepted, rejected = [], 0
+    for attachment in attachments:
+        is_image = (attachment.content_type or "").startswith("image/")
+        if is_image and attachment.size <= max_size and len(accepted) < limit: accepted.append(attachment.url)
+        else: rejected += 1
+    return accepted, rejected
+
+
+class AttachmentWaiter:
+    __slots__ = ("key", "queue", "replaced")
+
+    def __init__(self, key):
+        self.key = key
+        self.queue = asyncio.Queue(MAX_QUEUED_BATCHES)
+        self.replaced = False
+
+    # Próxima mensagem com anexos, ou None quando o tempo acaba ou a espera foi substituída.
+    async def next(self, timeout):
+        if timeout <= 0: return None
+        try: return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError: return None
+
+
+class AttachmentDispatcher:
+    # Esperas por anexos indexadas por (usuário, canal): cada mensagem recebida faz uma
+    # busca no dicionário em vez de testar todos os predicados pendentes do wait_for.
+    def __init__(self):
+        self.waiters = {}
+
+    def __len__(self): return len(self.waiters)
+
+    # Uma espera por usuário e canal: abrir outra encerra a anterior.
+    def open(self, user_id, channel_id):
+        key = (user_id, channel_id)
+        old = self.waiters.get(key)
+        if old is not None:
+            old.replaced = True
+            try: old.queue.put_nowait(None)
+            except asyncio.QueueFull: pass
+        waiter = self.waiters[key] = AttachmentWaiter(key)
+        return waiter
+
+    def close(self, waiter):
+        if self.waiters.get(waiter.key) is waiter: del self.waiters[waiter.key]
+
+    def dispatch(self, message):
+        if not message.attachments: return False
+        waiter = self.waiters.get((message.author.id, message.channel.id))
+        if waiter is None or waiter.replaced: return False
+        try: waiter.queue.put_nowait(message)
+        except asyncio.QueueFull: return False
+        return True